@@ -0,0 +1,483 @@
+"""Accounts: signup with email confirmation, login with lockout, password resets and the account page.
+
+Confirmation and reset emails go through the outbound email queue at the end
+of this module, which a background thread sends through Brevo.
+"""
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, flash, redirect, render_template, request, session, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import mail
+import metrics
+from extensions import db, login_manager
+from forms import (
+    LoginForm, LogoutForm, ResendConfirmationForm, ResetPasswordForm, ResetPasswordModalForm,
+    ResetPasswordRequestForm, SignupForm
+)
+from models import OutboundEmail, User, forget_cached_user, normalize_email
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('auth', __name__)
+
+
+def start_workers(app):
+    # Emails queued before a restart go out as soon as the process starts
+    start_mail_sender(app)
+
+
+def warm_up():
+    # The Brevo SDK (and httpx, through clients) are only needed once the first email goes out
+    import clients  # noqa: F401
+    import sib_api_v3_sdk  # noqa: F401
+
+
+# for email confirmation resends
+RESEND_COOLDOWN = timedelta(minutes=2)  # Cooldown for resending confirmation email after 1st resend
+LOCKOUT_DURATION = timedelta(minutes=1)  # Lock user for 1 minute
+MAX_ATTEMPTS = 5  # Max failed login attempts allowed
+
+def can_resend_confirmation(user):
+    if not user.last_confirmation_sent_at:
+        return True
+    return datetime.utcnow() - user.last_confirmation_sent_at > RESEND_COOLDOWN
+
+def get_serializer():
+    # Serializer for confirmation and password reset tokens
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+
+@login_manager.unauthorized_handler
+def unauthorized():
+    return redirect(url_for('auth.login'))
+
+# Routes for user authentication
+@bp.route('/signup', methods=['GET', 'POST'])
+def signup():
+    form = SignupForm()
+    if form.validate_on_submit():
+        email = form.email.data.strip()
+        password = form.password.data
+
+        # Check if the user already exists
+        user = User.query.filter_by(email_normalized=normalize_email(email)).first()
+        if user:
+            flash('Email already exists.', 'danger')
+            return redirect(url_for('auth.signup'))
+
+        # Create a new user with confirmation token
+        try:
+            new_user = User(email=email, password=generate_password_hash(password, method='pbkdf2:sha256'))
+            db.session.add(new_user)
+            db.session.commit()
+
+            # Generate token and send confirmation email
+            token = generate_confirmation_token(new_user.email)
+            new_user.confirmation_token = token
+            db.session.commit()
+
+            send_confirmation_email(new_user.email, token)
+
+            # Store the user's email in session to pre-fill the resend form
+            session['email_for_confirmation'] = new_user.email
+
+            # Remove the flash message to prevent duplication on email_sent.html
+            return redirect(url_for('auth.email_sent'))
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error creating user: {e}")
+            flash('An error occurred while creating the account. Please try again.', 'danger')
+
+    elif form.errors:
+        for field, errors in form.errors.items():
+            for error in errors:
+                flash(f"{error}", 'danger')
+
+    return render_template('signup.html', form=form)
+
+# Route for email_sent.html which allows users to resend confirmation email if needed
+@bp.route('/email_sent', methods=['GET', 'POST'])
+def email_sent():
+    form = ResendConfirmationForm()
+
+    # Retrieve the email from the session without removing it
+    email = session.get('email_for_confirmation', None)
+
+    if not email:
+        flash('No email found for confirmation resending. Please sign up again.', 'danger')
+        return redirect(url_for('auth.signup'))
+
+    # Logging to debug form validation
+    if request.method == 'POST':
+        logger.info("POST request received.")
+
+        if form.validate_on_submit():
+            logger.info("Form validation passed.")
+
+            user = User.query.filter_by(email_normalized=normalize_email(email)).first()
+
+            if not user:
+                flash('No account found with that email.', 'danger')
+                return redirect(url_for('auth.signup'))
+
+            if user.is_confirmed:
+                flash('Your email is already confirmed. Please log in.', 'success')
+                return redirect(url_for('auth.login'))
+
+            if not can_resend_confirmation(user):
+                flash('You can resend the confirmation email again later. Please try again after some time.', 'warning')
+                return redirect(url_for('auth.email_sent'))
+
+            try:
+                # Generate a new confirmation token
+                token = generate_confirmation_token(user.email)
+                user.confirmation_token = token
+                user.last_confirmation_sent_at = datetime.utcnow()
+                db.session.commit()
+
+                # Send the confirmation email again
+                send_confirmation_email(user.email, token)
+
+                flash('A new confirmation email has been sent. Please check your email.', 'success')
+                return redirect(url_for('auth.email_sent'))
+            except Exception as e:
+                flash('An error occurred while resending the confirmation email. Please try again.', 'danger')
+                return redirect(url_for('auth.email_sent'))
+
+        # Log form errors if validation failed
+        if not form.validate_on_submit():
+            logger.error(f"Form validation failed. Errors: {form.errors}")
+            flash('Unexpected Error. Please try again.', 'danger')
+
+    return render_template('email_sent.html', form=form, email=email)
+
+
+
+@bp.route('/reset_password', methods=['GET', 'POST'])
+def reset_password_request():
+    form = ResetPasswordRequestForm()
+    if form.validate_on_submit():
+        email = form.email.data.strip()
+        user = User.query.filter_by(email_normalized=normalize_email(email)).first()
+
+        if user:
+            # Generate a secure token
+            token = get_serializer().dumps(user.email, salt='password-reset-salt')
+            send_password_reset_email(user.email, token)
+            flash('A password reset link has been sent to your email.', 'info')
+            logger.info(f"Password reset requested for email: {email}")
+        else:
+            # Inform the user that the email does not exist
+            flash('The provided email address is not registered in our system.', 'danger')
+            logger.warning(f"Password reset requested for non-existent email: {email}")
+
+        return redirect(url_for('auth.login'))
+
+    return render_template('reset_password_request.html', form=form)
+
+@bp.route('/reset_password/<token>', methods=['GET', 'POST'])
+def reset_password(token):
+    try:
+        email = get_serializer().loads(token, salt='password-reset-salt', max_age=3600)  # Token valid for 1 hour
+    except SignatureExpired:
+        flash('The password reset link has expired.', 'danger')
+        return redirect(url_for('auth.reset_password_request'))
+    except BadSignature:
+        flash('The password reset link is invalid.', 'danger')
+        return redirect(url_for('auth.reset_password_request'))
+
+    user = User.query.filter_by(email_normalized=normalize_email(email)).first_or_404()
+    form = ResetPasswordForm()
+
+    if form.validate_on_submit():
+        password = form.password.data
+        confirm_password = form.confirm_password.data
+
+        if password != confirm_password:
+            flash('Passwords do not match.', 'danger')
+            return redirect(url_for('auth.reset_password', token=token))
+
+        if len(password) < 6:
+            flash('Password must be at least 6 characters long.', 'warning')
+            return redirect(url_for('auth.reset_password', token=token))
+
+        # Update the user's password
+        user.password = generate_password_hash(password, method='pbkdf2:sha256')
+        db.session.commit()
+        flash('Your password has been updated. Please log in.', 'success')
+        logger.info(f"Password updated for user: {email}")
+        return redirect(url_for('auth.login'))
+
+    return render_template('reset_password.html', form=form, token=token)
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        email = form.email.data.strip()
+        password = form.password.data
+        user = User.query.filter_by(email_normalized=normalize_email(email)).first()
+
+        if user:
+            # Counted before the password is checked, so a locked account never reaches the hash check
+            attempt = reserve_login_attempt(user.id)
+            if attempt is None:
+                flash('Too many failed attempts. Try again later.', 'danger')
+                return redirect(url_for('auth.login'))
+
+            # Check password
+            if check_password_hash(user.password, password):
+                # Reset failed attempts and lock_until on successful login
+                reset_login_attempts(user.id)
+
+                if not user.is_confirmed:
+                    flash('Please confirm your email before logging in.', 'danger')
+                    return redirect(url_for('auth.login'))
+
+                login_user(user)
+                return redirect(url_for('generator.generator'))
+            elif attempt >= MAX_ATTEMPTS:
+                # This attempt locked the account
+                flash(f'Too many failed attempts. Account locked for {LOCKOUT_DURATION.total_seconds() // 60} minutes.', 'danger')
+            else:
+                flash('Invalid email or password.', 'danger')
+        else:
+            flash('Invalid email or password.', 'danger')
+
+    return render_template('login.html', form=form)
+
+# Login attempts are counted with single UPDATE statements rather than read-modify-write in Python,
+# so concurrent attempts on one account can't lose counts and only MAX_ATTEMPTS of them get to the
+# password check per lockout. They bypass the ORM, so the cached user is dropped by hand.
+def reserve_login_attempt(user_id):
+    """Count a login attempt for an account that isn't locked and return its number.
+
+    Returns None while the account is locked. The attempt that reaches
+    MAX_ATTEMPTS locks the account straight away (it still gets its password
+    check, and a correct password lifts the lock); once a lock has run out,
+    counting starts again from 1.
+    """
+    now = datetime.utcnow()
+    lock_expired = db.and_(User.lock_until.isnot(None), User.lock_until <= now)
+    attempts = db.case((lock_expired, 1), else_=db.func.coalesce(User.failed_attempts, 0) + 1)
+    attempt = db.session.execute(
+        db.update(User)
+        .where(User.id == user_id, db.or_(User.lock_until.is_(None), User.lock_until <= now))
+        .values(
+            failed_attempts=attempts,
+            lock_until=db.case((attempts >= MAX_ATTEMPTS, now + LOCKOUT_DURATION), else_=None)
+        )
+        .returning(User.failed_attempts)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.session.commit()
+    forget_cached_user(user_id)
+    return attempt
+
+def reset_login_attempts(user_id):
+    db.session.execute(
+        db.update(User).where(User.id == user_id).values(failed_attempts=0, lock_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    forget_cached_user(user_id)
+
+@bp.route('/confirm/<token>')
+def confirm_email(token):
+    try:
+        email = confirm_token(token)
+    except (SignatureExpired, BadSignature):
+        flash('The confirmation link is invalid or has expired.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    user = User.query.filter_by(email_normalized=normalize_email(email)).first_or_404()
+
+    if user.is_confirmed:
+        flash('Account already confirmed. Please log in.', 'success')
+    else:
+        user.is_confirmed = True
+        user.confirmation_token = None
+        user.last_confirmation_sent_at = None  # Reset the timestamp
+        db.session.commit()
+        flash('You have confirmed your account. Thanks!', 'success')
+
+    return redirect(url_for('auth.login'))
+
+@bp.route('/logout', methods=['GET', 'POST'])
+@login_required
+def logout():
+    logout_user()
+    session.pop('email_for_confirmation', None)
+    flash('You have been logged out.', 'success')
+
+    return redirect(url_for('auth.login'))
+
+@bp.route('/my_account')
+@login_required
+def my_account():
+    reset_form = ResetPasswordModalForm()
+    logout_form = LogoutForm()
+    return render_template(
+        'my_account.html',
+        email=current_user.email,
+        plan=current_user.plan,
+        reset_form=reset_form,
+        logout_form=logout_form
+    )
+
+@bp.route('/upgrade_to_pro', methods=['GET', 'POST'])
+@login_required
+def upgrade_to_pro():
+    current_user.plan = 'pro'
+    db.session.commit()
+    flash('You have been upgraded to the Pro plan.', 'success')
+    return redirect(url_for('pages.pricing'))
+
+
+# Generate a confirmation token
+def generate_confirmation_token(email):
+    return get_serializer().dumps(email, salt='email-confirmation-salt')
+
+# Confirm the token
+def confirm_token(token, expiration=3600):
+    try:
+        email = get_serializer().loads(
+            token,
+            salt='email-confirmation-salt',
+            max_age=expiration
+        )
+        return email
+    except:
+        return False
+
+# Brevo transactional templates
+CONFIRMATION_TEMPLATE_ID = 1
+PASSWORD_RESET_TEMPLATE_ID = 2
+
+# Queue a confirmation email to be sent through Brevo
+def send_confirmation_email(user_email, token):
+    confirmation_url = url_for('auth.confirm_email', token=token, _external=True)
+    logger.debug(f"Confirmation URL: {confirmation_url}")
+
+    enqueue_email(user_email, CONFIRMATION_TEMPLATE_ID, {"confirmation_link": confirmation_url})
+    logger.info(f"Confirmation email queued for: {user_email}")
+
+# Queue a password reset email to be sent through Brevo
+def send_password_reset_email(user_email, token):
+    reset_url = url_for('auth.reset_password', token=token, _external=True)
+    logger.debug(f"Password Reset URL: {reset_url}")
+
+    enqueue_email(user_email, PASSWORD_RESET_TEMPLATE_ID, {"reset_link": reset_url})
+    logger.info(f"Password reset email queued for: {user_email}")
+
+
+# Outbound email queue. Emails are stored in the outbound_email table and sent by a background thread,
+# so requests never wait on Brevo. Due emails are sent in batches (one API call per template) and
+# failed sends are retried with exponential backoff.
+MAIL_BATCH_SIZE = 50
+MAIL_POLL_INTERVAL = 5  # Seconds between queue checks when idle
+MAIL_SEND_LEASE = timedelta(minutes=5)  # Emails claimed by a sender that died are picked up again after this
+MAIL_MAX_ATTEMPTS = 5
+MAIL_RETRY_BASE_DELAY = 30  # Seconds, doubled after every failed attempt
+
+_mail_wakeup = threading.Event()
+_mail_sender = None
+_mail_sender_lock = threading.Lock()
+
+def enqueue_email(to_email, template_id, params):
+    email = OutboundEmail(to_email=to_email, template_id=template_id, params=json.dumps(params))
+    db.session.add(email)
+    db.session.commit()
+
+    start_mail_sender(current_app._get_current_object())
+    _mail_wakeup.set()
+    return email
+
+def start_mail_sender(app):
+    # Started in every process after forking, like the summary job workers (a sender inherited across a fork isn't alive)
+    global _mail_sender
+    with _mail_sender_lock:
+        if _mail_sender is None or not _mail_sender.is_alive():
+            _mail_sender = threading.Thread(target=_mail_sender_loop, args=(app,), name="mail-sender", daemon=True)
+            _mail_sender.start()
+
+def claim_due_emails():
+    now = datetime.utcnow()
+    due = OutboundEmail.query.filter(
+        OutboundEmail.status.in_(['pending', 'sending']),
+        OutboundEmail.next_attempt_at <= now
+    ).order_by(OutboundEmail.next_attempt_at).limit(MAIL_BATCH_SIZE).all()
+
+    claimed = []
+    for email in due:
+        # Lease the email so other processes skip it while it's being sent
+        updated = OutboundEmail.query.filter_by(
+            id=email.id, status=email.status, next_attempt_at=email.next_attempt_at
+        ).update({'status': 'sending', 'next_attempt_at': now + MAIL_SEND_LEASE}, synchronize_session=False)
+        if updated:
+            claimed.append(email.id)
+    db.session.commit()
+    return OutboundEmail.query.filter(OutboundEmail.id.in_(claimed)).all() if claimed else []
+
+def retry_email_later(email, now, error):
+    email.attempts += 1
+    email.last_error = error
+    if email.attempts >= MAIL_MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + timedelta(seconds=MAIL_RETRY_BASE_DELAY * 2 ** (email.attempts - 1))
+
+def send_email_batch(emails):
+    transport = mail.get_transport()
+    by_template = {}
+    for email in emails:
+        by_template.setdefault(email.template_id, []).append(email)
+
+    for template_id, batch in by_template.items():
+        now = datetime.utcnow()
+        try:
+            message_ids = transport.send(template_id, [(email.to_email, json.loads(email.params)) for email in batch])
+        except Exception as e:
+            logger.error(f"Failed to send {len(batch)} email(s) with template {template_id}: {e}")
+            for email in batch:
+                retry_email_later(email, now, str(e))
+            metrics.inc('emails_failed_total', len(batch), help='email send attempts that failed')
+        else:
+            # The provider returns one id per message, in order. Emails past the ids it returned weren't
+            # confirmed, so they are retried like failed sends instead of being left in 'sending'.
+            sent, unconfirmed = batch[:len(message_ids)], batch[len(message_ids):]
+            if len(message_ids) != len(batch):
+                logger.warning(f"Mail provider returned {len(message_ids)} message id(s) for {len(batch)} email(s) "
+                               f"with template {template_id}")
+            for email, message_id in zip(sent, message_ids):
+                email.attempts += 1
+                email.status = 'sent'
+                email.sent_at = now
+                email.provider_message_id = message_id
+                logger.info(f"Email with template {template_id} sent to: {email.to_email}")
+            for email in unconfirmed:
+                retry_email_later(email, now, f"Mail provider returned no message id ({len(message_ids)} for {len(batch)} emails)")
+            metrics.inc('emails_sent_total', len(sent), help='emails handed to the mail provider')
+            if unconfirmed:
+                metrics.inc('emails_failed_total', len(unconfirmed), help='email send attempts that failed')
+        db.session.commit()
+
+def _mail_sender_loop(app):
+    while True:
+        try:
+            with app.app_context():
+                emails = claim_due_emails()
+                if emails:
+                    send_email_batch(emails)
+                    continue
+        except Exception as e:
+            logger.error(f"Mail sender failed: {e}")
+        _mail_wakeup.wait(MAIL_POLL_INTERVAL)
+        _mail_wakeup.clear()
@@ -0,0 +1,90 @@
+"""Measure how much compact_transcript() shrinks caption transcripts and how fast it runs.
+
+Runs over the caption fixtures in benchmarks/fixtures/captions (and, with
+--db, every transcript stored in the app database) and reports token counts
+before and after compaction plus preprocessing throughput.
+
+    python benchmarks/bench_compaction.py [--iterations N] [--db] [--show NAME]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from transcript_utils import compact_transcript, count_tokens  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'captions')
+MODEL = 'gpt-4o-mini'
+
+
+def segments_to_text(segments):
+    # Same joining as summaries.segments_to_text, without importing the app
+    return '\n'.join(segment['text'] for segment in segments)
+
+
+def load_fixtures():
+    # name -> (text, is_generated)
+    transcripts = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.json'))):
+        with open(path) as f:
+            fixture = json.load(f)
+        transcripts[os.path.splitext(os.path.basename(path))[0]] = (segments_to_text(fixture['segments']), fixture['is_generated'])
+    return transcripts
+
+
+def load_stored_transcripts():
+    from app import app
+    from models import Transcript
+
+    with app.app_context():
+        return {
+            f"db:{stored.video_id}:{stored.language}": (segments_to_text(stored.segments), bool(stored.is_generated))
+            for stored in Transcript.query.all()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', action='store_true', help='include transcripts stored in the app database')
+    parser.add_argument('--show', metavar='NAME', help='print the compacted text of one transcript')
+    args = parser.parse_args()
+
+    transcripts = load_fixtures()
+    if args.db:
+        transcripts.update(load_stored_transcripts())
+
+    if args.show:
+        text, is_generated = transcripts[args.show]
+        print(compact_transcript(text, rolling_captions=is_generated))
+        return 0
+
+    print(f"{'transcript':<28} {'tokens':>8} {'compact':>8} {'saved':>7} {'MB/s':>8} {'segments/s':>12}")
+    total_before = total_after = 0
+    for name, (text, is_generated) in transcripts.items():
+        before = count_tokens(text, MODEL)
+        after = count_tokens(compact_transcript(text, rolling_captions=is_generated), MODEL)
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            compact_transcript(text, rolling_captions=is_generated)
+        elapsed = (time.perf_counter() - start) / args.iterations
+
+        segments = text.count('\n') + 1
+        print(
+            f"{name:<28} {before:>8} {after:>8} {1 - after / before:>6.1%} "
+            f"{len(text.encode('utf-8')) / elapsed / 1e6:>8.2f} {segments / elapsed:>12.0f}"
+        )
+        total_before += before
+        total_after += after
+
+    print(f"{'total':<28} {total_before:>8} {total_after:>8} {1 - total_after / total_before:>6.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
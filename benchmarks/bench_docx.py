@@ -0,0 +1,84 @@
+"""Compare the old HTML-walking Word export with the Markdown tree exporter.
+
+    html walk  - the old download_word path: markdown -> HTML -> BeautifulSoup find_all()
+    tree       - docx_export.markdown_to_docx(), one pass over the Markdown element tree
+
+The summary is repeated --scale times to show how each grows with document size.
+
+    python benchmarks/bench_docx.py [--iterations N] [--scale N ...] [--summary PATH]
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import markdown  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from docx import Document  # noqa: E402
+
+import docx_export  # noqa: E402
+
+DEFAULT_SUMMARY = os.path.join(os.path.dirname(__file__), 'fixtures', 'summaries', 'birdhouse.md')
+
+
+def html_walk(summary_markdown):
+    # The old export, kept here for comparison
+    doc = Document()
+    doc.add_heading('Summary', 0)
+    soup = BeautifulSoup(markdown.markdown(summary_markdown), 'html.parser')
+    paragraphs = 0
+    for element in soup.find_all():
+        if element.name in ('h1', 'h2', 'h3'):
+            doc.add_heading(element.get_text(), level=int(element.name[1]))
+            paragraphs += 1
+        elif element.name == 'p':
+            doc.add_paragraph(element.get_text())
+            paragraphs += 1
+        elif element.name in ('ul', 'ol'):
+            for li in element.find_all('li'):
+                doc.add_paragraph(li.get_text(), style='List Bullet')
+                paragraphs += 1
+    word_file = BytesIO()
+    doc.save(word_file)
+    return paragraphs
+
+
+def paragraph_count(data):
+    return len(Document(BytesIO(data)).paragraphs) - 1  # Not counting the title
+
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--summary', default=DEFAULT_SUMMARY, help='Markdown file to export')
+    args = parser.parse_args()
+
+    with open(args.summary) as f:
+        summary = f.read()
+
+    print(f"{'scale':>5} {'html walk':>12} {'paragraphs':>10} {'tree':>12} {'paragraphs':>10}")
+    for scale in args.scale:
+        text = '\n\n'.join([summary] * scale)
+        walk = timed(lambda: html_walk(text), args.iterations)
+        tree = timed(lambda: docx_export.markdown_to_docx(text), args.iterations)
+        print(
+            f"{scale:>5} {walk * 1e3:9.1f} ms {html_walk(text):>10} "
+            f"{tree * 1e3:9.1f} ms {paragraph_count(docx_export.markdown_to_docx(text)):>10}"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
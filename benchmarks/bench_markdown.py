@@ -0,0 +1,54 @@
+"""Compare building a Markdown parser per call with reusing one instance.
+
+    per call  - markdown.markdown(), which builds a new Markdown instance every time
+    reused    - markdown_render.render_html(), one sanitizing instance per thread, reset between documents
+
+The tutorial summary is repeated --scale times to cover short and long summaries.
+
+    python benchmarks/bench_markdown.py [--iterations N] [--scale N ...] [--summary PATH]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import markdown  # noqa: E402
+
+import markdown_render  # noqa: E402
+
+DEFAULT_SUMMARY = os.path.join(os.path.dirname(__file__), 'fixtures', 'summaries', 'birdhouse.md')
+
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--summary', default=DEFAULT_SUMMARY, help='Markdown file to render')
+    args = parser.parse_args()
+
+    with open(args.summary) as f:
+        summary = f.read()
+
+    markdown_render.render_html(summary)  # Build this thread's instance outside the timings
+
+    print(f"{'scale':>5} {'chars':>8} {'per call':>12} {'reused':>12} {'speedup':>8}")
+    for scale in args.scale:
+        text = '\n\n'.join([summary] * scale)
+        per_call = timed(lambda: markdown.markdown(text, extensions=markdown_render.MARKDOWN_EXTENSIONS), args.iterations)
+        reused = timed(lambda: markdown_render.render_html(text), args.iterations)
+        print(f"{scale:>5} {len(text):>8} {per_call * 1e3:9.3f} ms {reused * 1e3:9.3f} ms {per_call / reused:7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Compare cold, warm and cached PDF rendering for a summary.
+
+    cold process  - a fresh Python process importing WeasyPrint and rendering once
+    per click     - the old download_pdf path: a new stylesheet/font setup for every render
+    warm          - pdf_renderer.render() with the shared stylesheet and font configuration
+    cached        - fetching a rendered PDF from the Flask-Caching filesystem cache
+
+    python benchmarks/bench_pdf.py [--iterations N] [--summary PATH]
+"""
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import markdown  # noqa: E402
+from cachelib import FileSystemCache  # noqa: E402
+
+import pdf_renderer  # noqa: E402
+
+DEFAULT_SUMMARY = os.path.join(os.path.dirname(__file__), 'fixtures', 'summaries', 'birdhouse.md')
+
+COLD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from weasyprint import HTML
+HTML(string=sys.stdin.read()).write_pdf()
+print(time.perf_counter() - start)
+"""
+
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--summary', default=DEFAULT_SUMMARY, help='Markdown file to render')
+    args = parser.parse_args()
+
+    with open(args.summary) as f:
+        html_body = markdown.markdown(f.read())
+    document = f"<html><body>{html_body}</body></html>"
+
+    cold = subprocess.run(
+        [sys.executable, '-c', COLD_SCRIPT], input=document, capture_output=True, text=True, check=True
+    )
+    print(f"{'cold process':<14} {float(cold.stdout.strip()) * 1e3:10.1f} ms")
+
+    from weasyprint import HTML
+    per_click = timed(lambda: HTML(string=document).write_pdf(), args.iterations)
+    print(f"{'per click':<14} {per_click * 1e3:10.1f} ms")
+
+    pdf_renderer.warm_up()
+    warm = timed(lambda: pdf_renderer.render(html_body), args.iterations)
+    print(f"{'warm':<14} {warm * 1e3:10.1f} ms")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = FileSystemCache(cache_dir)
+        key = f"pdf:{pdf_renderer.STYLESHEET_VERSION}:{hashlib.sha256(html_body.encode('utf-8')).hexdigest()}"
+        cache.set(key, pdf_renderer.render(html_body))
+        cached = timed(lambda: cache.get(key), args.iterations * 10)
+    print(f"{'cached':<14} {cached * 1e3:10.3f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
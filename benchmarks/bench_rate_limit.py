@@ -0,0 +1,95 @@
+"""Measure the per-request cost of rate limiting with each limits storage.
+
+Times requests to a trivial Flask route through the test client with no
+limiter, with memory:// storage and with the SQLite storage, using two
+application limits like the app's. Then has several processes hit one counter
+at once to show which storage actually shares it between workers.
+
+    python benchmarks/bench_rate_limit.py [--requests N] [--processes N]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from flask import Flask  # noqa: E402
+from flask_limiter import Limiter  # noqa: E402
+from flask_limiter.util import get_remote_address  # noqa: E402
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import FixedWindowRateLimiter  # noqa: E402
+
+import rate_limit_storage  # noqa: E402,F401
+
+# The same shape as the app's application limits, high enough that no request is rejected
+APPLICATION_LIMITS = ["10000000 per day", "10000000 per hour"]
+
+
+def build_app(storage_uri):
+    app = Flask(__name__)
+    if storage_uri:
+        Limiter(get_remote_address, app=app, storage_uri=storage_uri, application_limits=APPLICATION_LIMITS)
+
+    @app.route('/')
+    def index():
+        return 'ok'
+
+    return app
+
+
+def per_request(storage_uri, requests):
+    client = build_app(storage_uri).test_client()
+    for _ in range(50):  # Warm up (opens the SQLite connection)
+        client.get('/')
+    start = time.perf_counter()
+    for _ in range(requests):
+        assert client.get('/').status_code == 200
+    return (time.perf_counter() - start) / requests
+
+
+def hit_counter(storage_uri, hits, barrier):
+    limiter = FixedWindowRateLimiter(storage_from_string(storage_uri))
+    limit = parse("1000000 per hour")
+    barrier.wait()
+    for _ in range(hits):
+        limiter.hit(limit, 'shared')
+    print(f"    pid {os.getpid()} sees {limiter.get_window_stats(limit, 'shared').remaining} remaining")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--hits', type=int, default=500, help='Hits per process in the sharing test')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_uri = f"sqlite:///{os.path.join(tmp, 'limits.db')}"
+
+        baseline = per_request(None, args.requests)
+        print(f"{'no limiter':<12} {baseline * 1e6:8.1f} us/request")
+        for name, uri in (('memory://', 'memory://'), ('sqlite', sqlite_uri)):
+            cost = per_request(uri, args.requests)
+            print(f"{name:<12} {cost * 1e6:8.1f} us/request  (+{(cost - baseline) * 1e6:.1f} us for limiting)")
+
+        print(f"\n{args.processes} processes x {args.hits} hits on one counter "
+              f"(shared storage leaves {1000000 - args.processes * args.hits} remaining):")
+        context = multiprocessing.get_context('fork')
+        for name, uri in (('memory://', 'memory://'), ('sqlite', sqlite_uri)):
+            print(f"  {name}")
+            barrier = context.Barrier(args.processes)
+            workers = [context.Process(target=hit_counter, args=(uri, args.hits, barrier)) for _ in range(args.processes)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Measure how long the app takes to start and how much memory its workers use.
+
+Reports the module import time of app.py (from python -X importtime, with the
+slowest imports it pulls in), then starts gunicorn with and without
+GUNICORN_PRELOAD and reports the time from launch to the first successful
+response and the memory of each worker. RSS counts pages shared with the
+master in full; PSS splits them between the processes sharing them, so it
+shows what preloading saves. Each run is appended to
+benchmarks/results/startup.jsonl so start-up can be tracked over time.
+
+    python benchmarks/bench_startup.py [--workers N] [--runs N] [--no-save]
+"""
+import argparse
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+RESULTS_FILE = os.path.join(ROOT, 'benchmarks', 'results', 'startup.jsonl')
+STARTUP_TIMEOUT = 60  # Seconds
+
+
+def app_env(tmp, **extra):
+    env = dict(
+        os.environ, PYTHONPATH=ROOT, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+        RATELIMIT_STORAGE_URI='memory://', **extra  # Keep repeated runs from using up the shared rate limit
+    )
+    env.setdefault('OPENAI_API_KEY', 'unused')
+    return env
+
+
+def import_times(tmp):
+    """Return (total seconds to import app, [(module, seconds)] for its slowest direct imports)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=tmp, env=app_env(tmp), capture_output=True, text=True, check=True
+    )
+    total = 0.0
+    direct = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue  # The header line
+        seconds = int(cumulative) / 1e6
+        if name.strip() == 'app':
+            total = seconds
+        elif name.startswith('   ') and not name.startswith('    '):
+            direct.append((name.strip(), seconds))  # Imported by app.py itself (one level of indentation)
+    direct.sort(key=lambda item: item[1], reverse=True)
+    return total, direct[:8]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    found = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    if int(stat.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        found.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return found
+
+
+def memory_mb(pid):
+    """Return (rss, pss) of a process in MB, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key] = int(rest.split()[0]) / 1024
+    return values['Rss'], values['Pss']
+
+
+def start_server(tmp, workers, preload):
+    """Start gunicorn and return (elapsed seconds to the first 200 from /about, worker memory, master memory)."""
+    port = free_port()
+    env = app_env(tmp, GUNICORN_PRELOAD='1' if preload else '0')
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+         '--workers', str(workers), '--bind', f'127.0.0.1:{port}', 'app:app'],
+        cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+            if time.perf_counter() - start > STARTUP_TIMEOUT:
+                raise RuntimeError("gunicorn didn't answer in time")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/about', timeout=5) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.02)
+        elapsed = time.perf_counter() - start
+
+        # Let every worker finish booting before measuring them
+        deadline = time.perf_counter() + STARTUP_TIMEOUT
+        while len(children(server.pid)) < workers and time.perf_counter() < deadline:
+            time.sleep(0.1)
+        time.sleep(1)
+        worker_memory = [memory_mb(pid) for pid in children(server.pid)]
+        return elapsed, worker_memory, memory_mb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def git_commit():
+    result = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--runs', type=int, default=3, help='Starts per mode; the fastest is reported')
+    parser.add_argument('--no-save', action='store_true', help=f"Don't append to {os.path.relpath(RESULTS_FILE, ROOT)}")
+    args = parser.parse_args()
+
+    record = {
+        'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'workers': args.workers,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        total, slowest = min((import_times(tmp) for _ in range(args.runs)), key=lambda result: result[0])
+        print(f"import app: {total * 1e3:.0f} ms")
+        for name, seconds in slowest:
+            print(f"  {name:<24} {seconds * 1e3:7.1f} ms")
+        record['import_ms'] = round(total * 1e3, 1)
+        record['slowest_imports_ms'] = {name: round(seconds * 1e3, 1) for name, seconds in slowest}
+
+        print(f"\ngunicorn, {args.workers} workers:")
+        for preload in (False, True):
+            runs = [start_server(tmp, args.workers, preload) for _ in range(args.runs)]
+            elapsed, workers, master = min(runs, key=lambda run: run[0])
+            rss = sum(memory[0] for memory in workers) / len(workers)
+            pss = sum(memory[1] for memory in workers) / len(workers)
+            mode = 'preload' if preload else 'no_preload'
+            print(
+                f"  {mode:<11} first response {elapsed * 1e3:6.0f} ms   per worker RSS {rss:6.1f} MB  "
+                f"PSS {pss:6.1f} MB   master RSS {master[0]:6.1f} MB   total PSS {pss * len(workers) + master[1]:6.1f} MB"
+            )
+            record[mode] = {
+                'first_response_ms': round(elapsed * 1e3, 1),
+                'worker_rss_mb': round(rss, 1),
+                'worker_pss_mb': round(pss, 1),
+                'master_rss_mb': round(master[0], 1),
+                'total_pss_mb': round(pss * len(workers) + master[1], 1),
+            }
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, 'a') as results:
+            results.write(json.dumps(record) + '\n')
+        print(f"\nAppended to {os.path.relpath(RESULTS_FILE, ROOT)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
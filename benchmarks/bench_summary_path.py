@@ -0,0 +1,419 @@
+"""Offline load test of the summary path, from video metadata to the downloads.
+
+Nothing leaves the machine: yt-dlp and YouTubeTranscriptApi are replaced by
+stand-ins answering from the recorded fixtures (fixtures/metadata.json and the
+caption files) after --youtube-latency, and the app's own OpenAI client is
+pointed at a local server that returns fixtures/summaries/birdhouse.md after
+--openai-latency. Each scenario sends --requests requests through the Flask
+test client from --concurrency threads and reports p50/p95/p99 latency,
+throughput and memory:
+
+    fetch_metadata    POST /fetch_metadata for a video not seen before
+    generator         POST /generator for a new video, then poll its job until it's done
+    generator_cached  the same for videos that were summarized already
+    download_word     POST /download/word for a summary not exported before
+    download_pdf      the same for /download/pdf (needs WeasyPrint's system libraries)
+
+Every run is compared with benchmarks/results/summary_path_baseline.json when
+it exists; --save-baseline replaces that file with the run.
+
+    python benchmarks/bench_summary_path.py [--requests N] [--concurrency N] [--scenarios a,b,...]
+        [--youtube-latency MS] [--openai-latency MS] [--job-workers N] [--save-baseline]
+"""
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'results', 'summary_path_baseline.json')
+SCENARIOS = ['fetch_metadata', 'generator', 'generator_cached', 'download_word', 'download_pdf']
+JOB_POLL_INTERVAL = 0.02  # Seconds between job status requests
+JOB_TIMEOUT = 120
+STREAM_PIECES = 20  # Pieces a streamed completion is sent in
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def load_fixtures():
+    """Return {name: {'metadata': ..., 'captions': ...}} for every caption fixture."""
+    with open(os.path.join(FIXTURES_DIR, 'metadata.json')) as f:
+        metadata = json.load(f)
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'captions', '*.json'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as f:
+            fixtures[name] = {'metadata': metadata[name], 'captions': json.load(f)}
+    return fixtures
+
+
+# Offline stand-ins. Benchmark videos get made-up ids, each assigned one of the fixtures.
+FIXTURES = load_fixtures()
+VIDEOS = {}  # video id -> fixture name
+_video_numbers = itertools.count()
+youtube_latency = 0.0
+
+
+def new_video():
+    number = next(_video_numbers)
+    video_id = f"bench{number:06d}"
+    VIDEOS[video_id] = sorted(FIXTURES)[number % len(FIXTURES)]
+    return video_id
+
+
+class FakeYoutubeDL:
+    """yt_dlp.YoutubeDL answering extract_info() from the metadata fixtures."""
+
+    def __init__(self, params=None):
+        self.params = params
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=False):
+        from youtube_urls import parse_video_id
+
+        time.sleep(youtube_latency)
+        video_id = parse_video_id(url)
+        if video_id not in VIDEOS:
+            raise Exception(f"No fixture for {url}")
+        return {'id': video_id, **FIXTURES[VIDEOS[video_id]]['metadata']}
+
+
+class FakeTranscript:
+    def __init__(self, captions):
+        self.captions = captions
+        self.language_code = captions['language']
+        self.is_generated = captions['is_generated']
+
+    def fetch(self):
+        time.sleep(youtube_latency)
+        return [dict(segment) for segment in self.captions['segments']]
+
+
+class FakeTranscriptList:
+    def __init__(self, captions):
+        self.captions = captions
+
+    def find_transcript(self, languages):
+        return FakeTranscript(self.captions)
+
+    find_generated_transcript = find_transcript
+
+
+def fake_list_transcripts(video_id):
+    from youtube_transcript_api import TranscriptsDisabled
+
+    time.sleep(youtube_latency)
+    if video_id not in VIDEOS:
+        raise TranscriptsDisabled(video_id)
+    return FakeTranscriptList(FIXTURES[VIDEOS[video_id]]['captions'])
+
+
+def install_fakes():
+    import yt_dlp
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    yt_dlp.YoutubeDL = FakeYoutubeDL
+    YouTubeTranscriptApi.list_transcripts = staticmethod(fake_list_transcripts)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests with the canned summary after a fixed delay.
+
+    Streamed requests get the summary in STREAM_PIECES pieces, with the delay
+    spread between them.
+    """
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so the app's connection pool is used as with the real API
+    latency = 0.0
+    completion = ''
+    calls = itertools.count(1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        # Numbered, so every summary is a different document and downloads aren't served from the cache
+        content = f"{self.completion}\n\nSummary {next(self.calls)}.\n"
+        prompt_chars = sum(len(str(message.get('content', ''))) for message in request['messages'])
+        completion = {
+            'id': 'chatcmpl-bench',
+            'created': int(time.time()),
+            'model': request['model'],
+        }
+        usage = {
+            'prompt_tokens': prompt_chars // 4,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': (prompt_chars + len(content)) // 4,
+        }
+
+        if request.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            size = -(-len(content) // STREAM_PIECES)
+            for start in range(0, len(content), size):
+                time.sleep(self.latency / STREAM_PIECES)
+                delta = {'index': 0, 'finish_reason': None, 'delta': {'content': content[start:start + size]}}
+                self.write_event({**completion, 'object': 'chat.completion.chunk', 'choices': [delta]})
+            if (request.get('stream_options') or {}).get('include_usage'):
+                self.write_event({**completion, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})
+            self.write_chunk(b'data: [DONE]\n\n')
+            self.write_chunk(b'')
+            return
+
+        time.sleep(self.latency)
+        body = json.dumps({
+            **completion,
+            'object': 'chat.completion',
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def write_event(self, data):
+        self.write_chunk(f"data: {json.dumps(data)}\n\n".encode())
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_fake_openai(latency):
+    """Start the fake OpenAI server in a thread and return its base URL."""
+    with open(os.path.join(FIXTURES_DIR, 'summaries', 'birdhouse.md')) as f:
+        FakeOpenAIHandler.completion = f.read().strip()
+    FakeOpenAIHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def generate(client, video_id, summarized):
+    """Request a summary and wait for its job; record (video id, artifact id) when it's done."""
+    from youtube_urls import canonical_video_url
+
+    response = client.post(
+        '/generator', data={'youtubeLink': canonical_video_url(video_id)}, headers={'Accept': 'application/json'}
+    )
+    if response.status_code != 202:
+        return False
+
+    job = response.get_json()
+    deadline = time.perf_counter() + JOB_TIMEOUT
+    while time.perf_counter() < deadline:
+        job = client.get(job['status_url']).get_json()
+        if job['status'] == 'done':
+            summarized.append((video_id, job['artifact_id']))
+            return True
+        if job['status'] == 'failed':
+            return False
+        time.sleep(JOB_POLL_INTERVAL)
+    return False
+
+
+def scenario_requests(name, summarized):
+    """Return the function sending one request of a scenario, as send(client, index) -> succeeded."""
+    if name == 'fetch_metadata':
+        from youtube_urls import canonical_video_url
+        return lambda client, index: client.post(
+            '/fetch_metadata', json={'youtubeLink': canonical_video_url(new_video())}
+        ).status_code == 200
+    if name == 'generator':
+        return lambda client, index: generate(client, new_video(), summarized)
+
+    # The rest reuse summaries generated earlier, copied so the list isn't extended while it's read
+    done = list(summarized)
+    if name == 'generator_cached':
+        return lambda client, index: generate(client, done[index][0], [])
+    path = '/download/word' if name == 'download_word' else '/download/pdf'
+    return lambda client, index: client.post(path, data={'artifact_id': done[index][1]}).status_code == 200
+
+
+def run_scenario(app, send, args):
+    local = threading.local()
+
+    def timed(index):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        try:
+            succeeded = send(local.client, index)
+        except Exception:
+            succeeded = False
+        return time.perf_counter() - start, succeeded
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(timed, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, succeeded in results if succeeded]
+    stats = {
+        'requests': len(results),
+        'errors': len(results) - len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'rss_mb': round(rss_mb(), 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    for label, fraction in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+        stats[label] = round(percentile(latencies, fraction) * 1e3, 1) if latencies else None
+    return stats
+
+
+def rss_mb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def prepare_summaries(app, summarized, count, concurrency):
+    # Scenarios that reuse summaries use one per request; generate the missing ones untimed
+    missing = count - len(summarized)
+    if missing > 0:
+        clients = threading.local()
+
+        def generate_one(_):
+            if not hasattr(clients, 'client'):
+                clients.client = app.test_client()
+            generate(clients.client, new_video(), summarized)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(generate_one, range(missing)))
+
+
+def compare(stats, baseline):
+    if not baseline or baseline.get('p50_ms') is None or stats['p50_ms'] is None:
+        return ''
+    changes = []
+    for label in ('p50_ms', 'p95_ms'):
+        change = (stats[label] - baseline[label]) / baseline[label] * 100
+        changes.append(f"{label[:3]} {change:+.0f}%")
+    return '   vs baseline: ' + ', '.join(changes)
+
+
+def git_commit():
+    result = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=40, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated, run in this order')
+    parser.add_argument('--youtube-latency', type=float, default=200, help='ms per yt-dlp or caption request')
+    parser.add_argument('--openai-latency', type=float, default=800, help='ms per completion')
+    parser.add_argument('--job-workers', type=int, help='Summary job threads [default: SUMMARY_JOB_WORKERS]')
+    parser.add_argument('--save-baseline', action='store_true', help=f"Write this run to {os.path.relpath(BASELINE_FILE, ROOT)}")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    global youtube_latency
+    youtube_latency = args.youtube_latency / 1e3
+    logging.disable(logging.WARNING)  # Keep the per-job logs out of the report; errors still show
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['OPENAI_BASE_URL'] = start_fake_openai(args.openai_latency / 1e3)
+        os.environ['OPENAI_API_KEY'] = 'offline'
+
+        from app import create_app
+        from extensions import db
+
+        config = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'CACHE_DIR': os.path.join(tmp, 'cache'),
+            'RATELIMIT_STORAGE_URI': 'memory://',
+            'RATELIMIT_ENABLED': False,
+            'WTF_CSRF_ENABLED': False,
+        }
+        if args.job_workers:
+            config['SUMMARY_JOB_WORKERS'] = args.job_workers
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+        install_fakes()
+
+        record = {
+            'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'settings': {
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'youtube_latency_ms': args.youtube_latency,
+                'openai_latency_ms': args.openai_latency,
+                'job_workers': app.config['SUMMARY_JOB_WORKERS'],
+            },
+            'scenarios': {},
+        }
+
+        baseline = None
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE) as f:
+                baseline = json.load(f)
+            if baseline['settings'] != record['settings']:
+                print(f"Baseline settings differ, comparisons are rough: {baseline['settings']}")
+
+        print(
+            f"{args.requests} requests per scenario from {args.concurrency} threads, "
+            f"yt-dlp/captions {args.youtube_latency:.0f} ms, OpenAI {args.openai_latency:.0f} ms"
+        )
+        summarized = []
+        for name in scenarios:
+            if name in ('generator_cached', 'download_word', 'download_pdf'):
+                prepare_summaries(app, summarized, args.requests, args.concurrency)
+            stats = run_scenario(app, scenario_requests(name, summarized), args)
+            record['scenarios'][name] = stats
+            latency = (
+                f"p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms"
+                if stats['p50_ms'] is not None else f"{'no successful requests':<50}"
+            )
+            print(
+                f"  {name:<17} {latency}  {stats['throughput_rps']:7.2f} req/s  errors {stats['errors']}/{stats['requests']}  "
+                f"RSS {stats['rss_mb']:6.1f} MB{compare(stats, baseline and baseline['scenarios'].get(name))}"
+            )
+        print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(record, f, indent=1)
+            f.write('\n')
+        print(f"Saved to {os.path.relpath(BASELINE_FILE, ROOT)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Check the offline video id parser against a corpus of URL shapes and time it.
+
+Compares youtube_urls.parse_video_id() with the yt-dlp path the caption fetch
+used to take. By default only the offline part of that path is timed
+(constructing a YoutubeDL and matching the URL to an extractor); pass
+--network to also time a real extract_info() round trip. The accepted and
+rejected URL forms are asserted in tests/test_youtube_urls.py; the corpus
+check here only guards the timings.
+
+    python benchmarks/bench_video_id.py [--iterations N] [--network]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from youtube_urls import parse_video_id  # noqa: E402
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+# (url, expected id) - None means the parser should defer to yt-dlp
+CORPUS = [
+    (f'https://www.youtube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'https://youtube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'http://www.youtube.com/watch?v={VIDEO_ID}&t=42s', VIDEO_ID),
+    (f'https://www.youtube.com/watch?feature=share&v={VIDEO_ID}', VIDEO_ID),
+    (f'www.youtube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'youtube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'  https://www.youtube.com/watch?v={VIDEO_ID}  ', VIDEO_ID),
+    (f'https://m.youtube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'https://music.youtube.com/watch?v={VIDEO_ID}&si=abc', VIDEO_ID),
+    (f'https://WWW.YouTube.com/watch?v={VIDEO_ID}', VIDEO_ID),
+    (f'https://youtu.be/{VIDEO_ID}', VIDEO_ID),
+    (f'https://youtu.be/{VIDEO_ID}?t=10', VIDEO_ID),
+    (f'https://youtu.be/{VIDEO_ID}?si=XyZ123', VIDEO_ID),
+    (f'youtu.be/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/shorts/{VIDEO_ID}', VIDEO_ID),
+    (f'https://youtube.com/shorts/{VIDEO_ID}?feature=share', VIDEO_ID),
+    (f'https://m.youtube.com/shorts/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/embed/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/embed/{VIDEO_ID}?start=30', VIDEO_ID),
+    (f'https://www.youtube-nocookie.com/embed/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/live/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/live/{VIDEO_ID}?feature=share', VIDEO_ID),
+    (f'https://www.youtube.com/v/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/e/{VIDEO_ID}', VIDEO_ID),
+    (f'https://www.youtube.com/watch?v={VIDEO_ID}&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI&index=3', VIDEO_ID),
+    (f'https://www.youtube.com/watch?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI&index=3&v={VIDEO_ID}', VIDEO_ID),
+    (f'https://m.youtube.com/watch?v={VIDEO_ID}&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI&index=12', VIDEO_ID),
+    (f'https://www.youtube.com/attribution_link?a=abc&u=/watch%3Fv%3D{VIDEO_ID}%26feature%3Dshare', VIDEO_ID),
+    (VIDEO_ID, VIDEO_ID),
+    ('https://www.youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI', None),
+    ('https://www.youtube.com/@somechannel', None),
+    ('https://www.youtube.com/channel/UC38IQsAvIsxxjztdMZQtwHA', None),
+    ('https://www.youtube.com/watch?v=tooshort', None),
+    ('https://www.youtube.com/shorts/', None),
+    (f'https://vimeo.com/{VIDEO_ID}', None),
+    (f'https://example.com/watch?v={VIDEO_ID}', None),
+    ('not a url', None),
+    ('', None),
+]
+
+
+def check_corpus():
+    failures = []
+    for url, expected in CORPUS:
+        actual = parse_video_id(url)
+        if actual != expected:
+            failures.append((url, expected, actual))
+    for url, expected, actual in failures:
+        print(f"FAIL {url!r}: expected {expected!r}, got {actual!r}")
+    print(f"corpus: {len(CORPUS) - len(failures)}/{len(CORPUS)} URL shapes parsed as expected")
+    return not failures
+
+
+def time_it(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for url, _ in CORPUS:
+            func(url)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / (iterations * len(CORPUS))
+    print(f"{label:<32} {per_call * 1e6:12.2f} us/url")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--network', action='store_true', help='also time a live yt-dlp extract_info call')
+    args = parser.parse_args()
+
+    ok = check_corpus()
+
+    start = time.perf_counter()
+    import yt_dlp
+    print(f"{'import yt_dlp':<32} {(time.perf_counter() - start) * 1e3:12.2f} ms (one-off)")
+
+    from summaries import YDL_OPTS
+
+    def ytdlp_offline(url):
+        with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
+            for ie in ydl._ies.values():
+                if ie.suitable(url):
+                    return ie.get_temp_id(url)
+        return None
+
+    parser_time = time_it('parse_video_id', parse_video_id, args.iterations)
+    ytdlp_time = time_it('YoutubeDL + extractor match', ytdlp_offline, max(1, args.iterations // 20))
+    print(f"speedup (offline only): {ytdlp_time / parser_time:.0f}x")
+
+    if args.network:
+        with yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
+            start = time.perf_counter()
+            ydl.extract_info(CORPUS[0][0], download=False)
+            print(f"{'extract_info (network)':<32} {(time.perf_counter() - start) * 1e3:12.2f} ms")
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Concurrent login load test against SQLite, with and without the connection pragmas.
+
+Several worker processes (like gunicorn workers), each running several threads,
+POST to /login through the Flask test client. Logins alternate between a wrong
+and the right password, so every request writes failed_attempts. Run once with
+the database in the default rollback journal mode and once with the pragmas
+the Engine connect listener in extensions.py applies (WAL, busy_timeout,
+synchronous=NORMAL), and report
+throughput, latency and how many requests failed with "database is locked".
+
+    python benchmarks/load_login.py [--processes N] [--threads N] [--requests N] [--users N]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'correct horse battery staple'
+MODES = {
+    'rollback': 'rollback journal, no pragmas',
+    'wal': 'WAL + busy_timeout + synchronous=NORMAL',
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def login_worker(app, worker, args, results):
+    client = app.test_client()
+    latencies = []
+    errors = 0
+    for i in range(args.requests):
+        email = f"user{(worker + i) % args.users}@example.com"
+        password = PASSWORD if i % 2 else 'wrong password'
+        start = time.perf_counter()
+        response = client.post('/login', data={'email': email, 'password': password})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            errors += 1
+    results.put((latencies, errors))
+
+
+def worker_process(app, process_index, args, results):
+    threads = [
+        threading.Thread(target=login_worker, args=(app, process_index * args.threads + i, args, results))
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_mode(args):
+    """Runs in its own interpreter, since the rollback mode removes the connect pragmas for the whole process."""
+    logging.disable(logging.CRITICAL)  # Locked-database tracebacks would flood the output
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from werkzeug.security import generate_password_hash
+
+    from app import create_app
+    from extensions import db, set_sqlite_pragmas
+    from models import User
+
+    if args.mode == 'rollback':
+        event.remove(Engine, 'connect', set_sqlite_pragmas)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(args.tmp, f'{args.mode}.db')}",
+        'RATELIMIT_ENABLED': False,
+        'WTF_CSRF_ENABLED': False,
+    })
+
+    with app.app_context():
+        db.create_all()
+        if args.mode == 'rollback':
+            db.session.execute(db.text("PRAGMA journal_mode=DELETE"))
+        # Cheap hashes so the database, not password hashing, is what's measured
+        password_hash = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1000')
+        db.session.add_all(
+            User(email=f"user{i}@example.com", password=password_hash, is_confirmed=True, failed_attempts=0)
+            for i in range(args.users)
+        )
+        db.session.commit()
+        db.engine.dispose()  # Don't share pooled connections with the forked workers
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=worker_process, args=(app, i, args, results)) for i in range(args.processes)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    latencies = []
+    errors = 0
+    for _ in range(args.processes * args.threads):
+        worker_latencies, worker_errors = results.get()
+        latencies.extend(worker_latencies)
+        errors += worker_errors
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    print(
+        f"{MODES[args.mode]:<42} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {percentile(latencies, 0.5) * 1e3:7.1f} ms  p95 {percentile(latencies, 0.95) * 1e3:7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1e3:7.1f} ms  errors {errors}/{len(latencies)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='Threads per process')
+    parser.add_argument('--requests', type=int, default=100, help='Logins per thread')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--tmp', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return 0
+
+    print(f"{args.processes} processes x {args.threads} threads x {args.requests} logins, {args.users} users")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in MODES:
+            subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--tmp', tmp,
+                 '--processes', str(args.processes), '--threads', str(args.threads),
+                 '--requests', str(args.requests), '--users', str(args.users)],
+                check=True, cwd=tmp
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Hammer one account with concurrent wrong-password logins and report how it holds up.
+
+Many threads POST wrong passwords for the same user to /login through the
+Flask test client, against a fresh SQLite database, and the run reports the
+throughput, server errors, password checks and the lockout it ended with.
+Every attempt is counted with an atomic UPDATE before the password is
+checked; tests/test_auth_lockout.py asserts that at most MAX_ATTEMPTS reach
+check_password_hash, so this is for load beyond what the test runs.
+
+    python benchmarks/stress_login_lockout.py [--threads N] [--requests N]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+EMAIL = 'target@example.com'
+PASSWORD = 'correct horse battery staple'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=10, help='Logins per thread')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)  # Keep the app's cache directory out of the source tree
+    logging.disable(logging.CRITICAL)
+
+    from werkzeug.security import generate_password_hash
+
+    import auth
+    from app import create_app
+    from extensions import db
+    from models import User
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp.name, 'stress.db')}",
+        'RATELIMIT_ENABLED': False,
+        'WTF_CSRF_ENABLED': False,
+    })
+
+    with app.app_context():
+        db.create_all()
+        user = User(email=EMAIL, password=generate_password_hash(PASSWORD, method='pbkdf2:sha256'), is_confirmed=True)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    # Count how many requests get as far as the (deliberately slow) password check
+    verifications = []
+    check_password_hash = auth.check_password_hash
+
+    def counting_check(pwhash, password):
+        verifications.append(password)
+        return check_password_hash(pwhash, password)
+
+    auth.check_password_hash = counting_check
+
+    statuses = []
+    barrier = threading.Barrier(args.threads)
+
+    def attacker():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(args.requests):
+            statuses.append(client.post('/login', data={'email': EMAIL, 'password': 'guess'}).status_code)
+
+    threads = [threading.Thread(target=attacker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        failed_attempts, lock_until = user.failed_attempts, user.lock_until
+
+    correct = app.test_client().post('/login', data={'email': EMAIL, 'password': PASSWORD})
+
+    print(f"{len(statuses)} wrong-password logins from {args.threads} threads in {elapsed:.2f}s "
+          f"({len(statuses) / elapsed:.0f} req/s)")
+    print(f"  server errors:            {sum(1 for status in statuses if status >= 500)}")
+    print(f"  password checks run:      {len(verifications)} (limit {auth.MAX_ATTEMPTS})")
+    print(f"  failed_attempts recorded: {failed_attempts}")
+    print(f"  locked until:             {lock_until}")
+    print(f"  right password while locked -> {correct.status_code} {correct.location or ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Shared, pooled clients for the external APIs the app calls.
+
+Each process builds one OpenAI client and one Brevo API client and reuses them,
+so connections are kept alive between requests instead of being set up again
+for every summary or email. The SDKs are slow to import, so each one is only
+imported when its client is first built; callers import this module lazily
+too, since httpx alone is a sizeable share of worker start-up.
+"""
+import os
+import threading
+import time
+
+import httpx
+
+import metrics
+
+# Connect fast or fail, but give completions time to finish; the pool timeout bounds
+# how long a request may wait for a free connection before it errors out.
+OPENAI_TIMEOUT = httpx.Timeout(connect=5.0, read=120.0, write=30.0, pool=30.0)
+OPENAI_MAX_RETRIES = 3  # The OpenAI SDK retries connection errors, 408/409/429 and 5xx with exponential backoff
+OPENAI_KEEPALIVE_EXPIRY = 60.0
+
+BREVO_REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTP transport that records how long requests wait for a pooled connection.
+
+    The wait is measured with httpcore's trace extension: time from handing the
+    request to the pool until its headers are sent, minus any time spent opening
+    a new connection (reported separately).
+    """
+
+    def __init__(self, name, max_connections, **kwargs):
+        super().__init__(limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+        ), **kwargs)
+        self.name = name
+        self.max_connections = max_connections
+
+        metrics.register_gauge(
+            'http_pool_connections', self._connection_counts,
+            help='connections currently held in the HTTP pool'
+        )
+        metrics.register_gauge(
+            'http_pool_saturation', lambda: {(('client', self.name),): self.saturation()},
+            help='share of the HTTP pool connection limit in use'
+        )
+
+    def _connections(self):
+        return list(self._pool.connections)
+
+    def _connection_counts(self):
+        connections = self._connections()
+        active = sum(1 for connection in connections if not connection.is_idle())
+        return {
+            (('client', self.name), ('state', 'active')): active,
+            (('client', self.name), ('state', 'idle')): len(connections) - active,
+            (('client', self.name), ('state', 'max')): self.max_connections,
+        }
+
+    def saturation(self):
+        active = sum(1 for connection in self._connections() if not connection.is_idle())
+        return round(active / self.max_connections, 3)
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        events = {}
+        upstream_trace = request.extensions.get('trace')
+
+        def trace(event, info):
+            events.setdefault(event, time.perf_counter())
+            if upstream_trace:
+                upstream_trace(event, info)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        try:
+            return super().handle_request(request)
+        finally:
+            self._record(start, events)
+
+    def _record(self, start, events):
+        metrics.inc('http_requests_total', help='HTTP requests sent by shared clients', client=self.name)
+
+        sent = next((at for event, at in events.items() if event.endswith('send_request_headers.started')), None)
+        if sent is None:
+            return
+
+        connect = 0.0
+        if 'connection.connect_tcp.started' in events:
+            connected = events.get('connection.start_tls.complete') or events.get('connection.connect_tcp.complete', sent)
+            connect = connected - events['connection.connect_tcp.started']
+            metrics.observe('http_connect_seconds', connect, help='time spent opening new connections', client=self.name)
+
+        metrics.observe(
+            'http_pool_wait_seconds', max(0.0, sent - start - connect),
+            help='time requests spent waiting for a pooled connection', client=self.name
+        )
+
+
+def create_openai_client(api_key, max_connections):
+    from openai import OpenAI
+
+    transport = InstrumentedTransport('openai', max_connections)
+    return OpenAI(
+        api_key=api_key,
+        timeout=OPENAI_TIMEOUT,
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=httpx.Client(transport=transport, timeout=OPENAI_TIMEOUT)
+    )
+
+
+_openai_client = None
+_openai_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Return the process-wide OpenAI client, creating it on first use.
+
+    The pool is sized for the busiest case: every job thread running its chunk
+    calls at once, plus streams.
+    """
+    global _openai_client
+    with _openai_lock:
+        if _openai_client is None:
+            _openai_client = create_openai_client(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_connections=int(os.getenv('OPENAI_MAX_CONNECTIONS', 16))
+            )
+        return _openai_client
+
+
+_brevo_api = None
+_brevo_lock = threading.Lock()
+
+
+def get_brevo_api():
+    """Return the process-wide Brevo TransactionalEmailsApi, creating it on first use."""
+    global _brevo_api
+    with _brevo_lock:
+        if _brevo_api is None:
+            import sib_api_v3_sdk
+
+            configuration = sib_api_v3_sdk.Configuration()
+            configuration.api_key['api-key'] = os.getenv("BREVO_API_KEY")
+            _brevo_api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+        return _brevo_api
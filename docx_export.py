@@ -0,0 +1,228 @@
+"""Word export for summaries, built straight from the Markdown element tree.
+
+Python-Markdown parses the summary into an ElementTree; a tree processor that
+runs after inline parsing hands that tree over, and DocxBuilder walks it once,
+adding one Word paragraph (or run) per node. Ordered lists use real Word
+numbering that restarts for every list, nested lists use the indented list
+styles, and fenced code blocks come out as monospace paragraphs.
+"""
+import html
+import re
+import threading
+from io import BytesIO
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import HTML_PLACEHOLDER_RE
+from docx import Document
+from docx.shared import Pt
+
+# Bump when the document layout changes so cached exports are built again
+DOCX_EXPORT_VERSION = 1
+
+CODE_FONT = 'Courier New'
+CODE_FONT_SIZE = Pt(9)
+MAX_LIST_DEPTH = 3  # The default template has List Bullet/Number styles up to level 3
+
+HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+BLOCK_TAGS = {'p', 'ul', 'ol', 'pre', 'blockquote', 'hr', 'div', 'table', *HEADINGS}
+
+# fenced_code stashes its output as raw HTML, so code blocks reach the tree as placeholders
+STASHED_CODE_RE = re.compile(r'^\s*<pre[^>]*><code[^>]*>(.*?)</code></pre>\s*$', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+class _CaptureTree(Treeprocessor):
+    def run(self, root):
+        self.md.element_tree = root
+
+
+class _CaptureTreeExtension(Extension):
+    def extendMarkdown(self, md):
+        # Lowest priority, so it runs after inline parsing and unescaping
+        md.treeprocessors.register(_CaptureTree(md), 'capture_tree', -100)
+
+
+_local = threading.local()
+
+
+def _get_markdown():
+    # Markdown instances aren't thread safe but are cheap to reset, so keep one per thread
+    md = getattr(_local, 'md', None)
+    if md is None:
+        md = _local.md = markdown.Markdown(extensions=['fenced_code', 'sane_lists', _CaptureTreeExtension()])
+    return md
+
+
+def _list_style(kind, depth):
+    level = min(depth, MAX_LIST_DEPTH)
+    return kind if level == 1 else f"{kind} {level}"
+
+
+class DocxBuilder:
+    def __init__(self, md, title='Summary'):
+        self.md = md
+        self.doc = Document()
+        self.doc.add_heading(title, 0)
+        self._style_ids = {}
+
+    def paragraph(self, style=None):
+        # python-docx scans every style when a style is given by name, so look each one up only once
+        paragraph = self.doc.add_paragraph()
+        if style:
+            if style not in self._style_ids:
+                self._style_ids[style] = self.doc.styles[style].style_id
+            paragraph._p.get_or_add_pPr().style = self._style_ids[style]
+        return paragraph
+
+    def build(self, root):
+        for element in root:
+            self.block(element)
+        return self.doc
+
+    # Blocks
+
+    def block(self, element, depth=0):
+        tag = element.tag
+        if tag in HEADINGS:
+            self.inline(self.paragraph(f'Heading {HEADINGS[tag]}'), element)
+        elif tag in ('ul', 'ol'):
+            self.list(element, depth + 1)
+        elif tag == 'pre':
+            self.code_block(''.join(element.itertext()))
+        elif tag == 'blockquote':
+            for child in element:
+                self.inline(self.paragraph('Quote'), child)
+        elif tag == 'hr':
+            return
+        elif tag == 'p' and self.stashed_block(element):
+            return
+        else:
+            self.inline(self.paragraph(), element)
+
+    def stashed_block(self, element):
+        # A paragraph holding only a placeholder is a stashed raw block: a fenced code block or HTML
+        match = HTML_PLACEHOLDER_RE.fullmatch((element.text or '').strip())
+        if not match or len(element):
+            return False
+
+        raw = self.md.htmlStash.rawHtmlBlocks[int(match.group(1))]
+        if not isinstance(raw, str):
+            raw = ''.join(raw.itertext())
+        code = STASHED_CODE_RE.match(raw)
+        if code:
+            self.code_block(html.unescape(code.group(1)))
+        else:
+            text = html.unescape(TAG_RE.sub('', raw)).strip()
+            if text:
+                self.paragraph().add_run(text)
+        return True
+
+    def code_block(self, code):
+        paragraph = self.paragraph()
+        run = paragraph.add_run(code.rstrip('\n'))  # python-docx turns newlines into line breaks
+        run.font.name = CODE_FONT
+        run.font.size = CODE_FONT_SIZE
+
+    def list(self, element, depth):
+        if element.tag == 'ol':
+            style = _list_style('List Number', depth)
+            num_id = self.restart_numbering(style, int(element.get('start', 1)))
+        else:
+            style = _list_style('List Bullet', depth)
+            num_id = None
+
+        for item in element:
+            if item.tag == 'li':
+                self.list_item(item, style, num_id, depth)
+
+    def list_item(self, item, style, num_id, depth):
+        paragraph = self.paragraph(style)
+        if num_id is not None:
+            num_pr = paragraph._p.get_or_add_pPr().get_or_add_numPr()
+            num_pr.get_or_add_ilvl().val = 0
+            num_pr.get_or_add_numId().val = num_id
+
+        # Tight items hold inline content directly, loose ones wrap it in <p>; later blocks continue the item
+        has_text = self.add_text(paragraph, item.text)
+        for child in item:
+            if child.tag in ('ul', 'ol'):
+                self.list(child, depth + 1)
+            elif child.tag == 'p':
+                target = paragraph if not has_text else self.paragraph(_list_style('List Continue', depth))
+                self.inline(target, child)
+                has_text = True
+            elif child.tag in BLOCK_TAGS:
+                self.block(child, depth)
+            else:
+                self.inline_element(paragraph, child)
+                has_text = True
+                self.add_text(paragraph, child.tail)
+
+    def restart_numbering(self, style, start):
+        """Give a numbered list its own Word numbering instance so it counts from start."""
+        numbering = self.doc.part.numbering_part.element
+        style_num_id = self.doc.styles[style].element.pPr.numPr.numId.val
+        abstract_num_id = numbering.num_having_numId(style_num_id).abstractNumId.val
+
+        num = numbering.add_num(abstract_num_id)
+        num.add_lvlOverride(ilvl=0).add_startOverride(start)
+        return num.numId
+
+    # Inline content
+
+    def inline(self, paragraph, element, bold=False, italic=False, code=False):
+        self.add_text(paragraph, element.text, bold, italic, code)
+        for child in element:
+            self.inline_element(paragraph, child, bold, italic, code)
+            self.add_text(paragraph, child.tail, bold, italic, code)
+
+    def inline_element(self, paragraph, element, bold=False, italic=False, code=False):
+        tag = element.tag
+        if tag == 'br':
+            paragraph.add_run().add_break()
+        elif tag == 'img':
+            self.add_text(paragraph, element.get('alt'), bold, italic, code)
+        else:
+            self.inline(
+                paragraph, element,
+                bold=bold or tag in ('strong', 'b'),
+                italic=italic or tag in ('em', 'i'),
+                code=code or tag == 'code'
+            )
+
+    def add_text(self, paragraph, text, bold=False, italic=False, code=False):
+        if not text:
+            return False
+        # Inline raw HTML is stashed too; keep its text only
+        text = HTML_PLACEHOLDER_RE.sub(
+            lambda match: html.unescape(TAG_RE.sub('', str(self.md.htmlStash.rawHtmlBlocks[int(match.group(1))]))),
+            text
+        ).replace('\n', ' ')
+        if not paragraph.runs:
+            text = text.lstrip()
+        if not text:
+            return False
+
+        run = paragraph.add_run(text)
+        run.bold = bold or None
+        run.italic = italic or None
+        if code:
+            run.font.name = CODE_FONT
+        return True
+
+
+def markdown_to_docx(markdown_text, title='Summary'):
+    """Build a Word document from a summary's Markdown and return it as bytes."""
+    md = _get_markdown()
+    md.reset()
+    md.convert(markdown_text)
+    try:
+        doc = DocxBuilder(md, title).build(md.element_tree)
+    finally:
+        md.element_tree = None
+
+    word_file = BytesIO()
+    doc.save(word_file)
+    return word_file.getvalue()
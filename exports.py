@@ -0,0 +1,100 @@
+"""Summary downloads as PDF and Word documents.
+
+Rendering is CPU-heavy (WeasyPrint especially), so this component can be
+served by its own workers, sized separately from the page views.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from flask import Blueprint, current_app, flash, redirect, request, send_file, url_for
+
+import metrics
+import pdf_renderer
+from extensions import cache
+from models import Summary
+from profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('export', __name__)
+
+DEFAULT_CONFIG = {
+    'PDF_CACHE_TIMEOUT': 24 * 60 * 60,  # Keep rendered PDFs for a day
+    'DOCX_CACHE_TIMEOUT': 24 * 60 * 60,  # Keep built Word documents for a day
+}
+
+
+def warm_up():
+    import docx_export  # noqa: F401
+
+    if pdf_renderer.PDF_RENDER_WORKERS <= 0:
+        pdf_renderer.warm_up()  # Rendering happens in the request process, so set WeasyPrint up there
+
+
+@bp.route('/download/pdf', methods=['POST'])
+@profiled
+def download_pdf():
+    # Remove the pro plan check
+    summary = get_summary_artifact(request.form.get('artifact_id'))
+
+    if not summary:
+        flash("No summary available for download. Please generate a summary first.", "danger")
+        return redirect(url_for('generator.generator'))
+
+    try:
+        pdf_file = BytesIO(get_summary_pdf(summary.html))
+    except pdf_renderer.PdfRenderError as e:
+        logger.error(f"PDF download failed: {e}")
+        metrics.inc('pdf_render_failures_total', help='PDF renders that timed out or whose render pool broke',
+                    reason='timeout' if isinstance(e, pdf_renderer.PdfRenderTimeout) else 'pool')
+        flash("Creating the PDF failed. Please try again in a moment, or download the Word version.", "danger")
+        return redirect(url_for('generator.generator'))
+    return send_file(pdf_file, as_attachment=True, download_name="summary.pdf")
+
+def get_summary_artifact(artifact_id):
+    # Downloads refer to a stored summary by its artifact id rather than posting the document back
+    if not artifact_id:
+        return None
+    return Summary.query.filter_by(artifact_id=artifact_id).first()
+
+def get_summary_pdf(html_summary):
+    # The same summary is often downloaded several times, so rendered PDFs are cached by content hash
+    digest = hashlib.sha256(html_summary.encode('utf-8')).hexdigest()
+    cache_key = f"pdf:{pdf_renderer.STYLESHEET_VERSION}:{digest}"
+
+    pdf = cache.get(cache_key)
+    metrics.inc('cache_lookups_total', help='cache lookups by cache and result', cache='pdf', result='miss' if pdf is None else 'hit')
+    if pdf is None:
+        with metrics.span('pdf'):
+            pdf = pdf_renderer.render_pdf(html_summary)
+        cache.set(cache_key, pdf, timeout=current_app.config['PDF_CACHE_TIMEOUT'])
+    return pdf
+
+@bp.route('/download/word', methods=['POST'])
+@profiled
+def download_word():
+    # Remove the pro plan check
+    summary = get_summary_artifact(request.form.get('artifact_id'))
+
+    if not summary:
+        flash("No summary available for download. Please generate a summary first.", "danger")
+        return redirect(url_for('generator.generator'))
+
+    word_file = BytesIO(get_summary_docx(summary.markdown_text))
+    return send_file(word_file, as_attachment=True, download_name="summary.docx")
+
+def get_summary_docx(summary_markdown):
+    # Built from the Markdown tree rather than re-parsing HTML, and cached by content hash like PDFs
+    import docx_export
+
+    digest = hashlib.sha256(summary_markdown.encode('utf-8')).hexdigest()
+    cache_key = f"docx:{docx_export.DOCX_EXPORT_VERSION}:{digest}"
+
+    word = cache.get(cache_key)
+    metrics.inc('cache_lookups_total', help='cache lookups by cache and result', cache='docx', result='miss' if word is None else 'hit')
+    if word is None:
+        with metrics.span('docx'):
+            word = docx_export.markdown_to_docx(summary_markdown)
+        cache.set(cache_key, word, timeout=current_app.config['DOCX_CACHE_TIMEOUT'])
+    return word
@@ -0,0 +1,50 @@
+"""Flask extensions shared by the blueprints, bound to an app by create_app().
+
+Created here without an app so models and blueprints can import them, and
+every app the factory builds (one per tier, or per test) gets its own
+configuration.
+"""
+import sqlite3
+
+from flask import request
+from flask_caching import Cache
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_login import LoginManager
+from flask_migrate import Migrate
+from flask_sqlalchemy import SQLAlchemy
+from flask_wtf import CSRFProtect
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import rate_limit_storage  # noqa: F401  Registers the sqlite:// storage scheme used by the limiter
+
+db = SQLAlchemy()
+migrate = Migrate()
+login_manager = LoginManager()
+csrf = CSRFProtect()
+cache = Cache()
+
+# One budget per client across all routes. Counters are kept in the storage given by RATELIMIT_STORAGE_URI
+# (create_app defaults it to a SQLite file in the instance folder, shared by every gunicorn worker).
+# Static files are never counted.
+limiter = Limiter(get_remote_address, application_limits=["200 per day", "50 per hour"])
+
+
+# Job status is polled every couple of seconds while a summary is generated, and /metrics is scraped,
+# so neither counts towards the limits
+@limiter.request_filter
+def exempt_polling_endpoints():
+    return request.endpoint in ('generator.job_status', 'pages.metrics_endpoint')
+
+
+# SQLite runs in WAL mode so readers don't block the writer (and vice versa); writers wait for the lock
+# instead of failing straight away, and commits don't fsync until a checkpoint
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
@@ -0,0 +1,235 @@
+"""The summary generator: the generator page, its job and streaming endpoints, and batch summaries.
+
+The work itself is done by the pipeline in summaries.py; these views start it
+and report on it. This is the component that talks to YouTube and OpenAI, so
+it's the one to give its own, bigger workers when the tiers are split.
+"""
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+import click
+from flask import Blueprint, Response, jsonify, redirect, render_template, request, stream_with_context, url_for
+from flask_login import login_required
+
+from extensions import db
+from models import SummaryJob
+from profiling import profiled
+from summaries import SUMMARY_MODEL, enqueue_summary_job, get_job_progress, resolve_video, run_batch, start_job_workers
+
+logger = logging.getLogger(__name__)
+
+# cli_group=None keeps the command at "flask summarize-batch"
+bp = Blueprint('generator', __name__, cli_group=None)
+
+DEFAULT_CONFIG = {
+    # Generated summaries are reused for this long, and at most this many are kept (least recently used go first)
+    'SUMMARY_CACHE_TTL': timedelta(days=int(os.getenv('SUMMARY_CACHE_TTL_DAYS', 7))),
+    'SUMMARY_CACHE_MAX_ENTRIES': int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', 1000)),
+    'SUMMARY_JOB_WORKERS': int(os.getenv('SUMMARY_JOB_WORKERS', 2)),  # Background job threads per process
+    'SUMMARY_CHUNK_WORKERS': int(os.getenv('SUMMARY_CHUNK_WORKERS', 4)),  # Chunks of a long transcript summarized at once
+    'BATCH_WORKERS': int(os.getenv('BATCH_WORKERS', 4)),  # Videos summarized at once per batch
+}
+
+STREAM_POLL_INTERVAL = 0.25  # Seconds between job checks while relaying a job over /generator/stream
+STREAM_KEEPALIVE = 15  # Seconds of silence before a keepalive comment is sent
+STREAM_MAX_DURATION = 30 * 60  # Seconds a stream follows one job before the client falls back to polling it
+
+
+def start_workers(app):
+    # Queued jobs, including ones left over from before a restart, are picked up as soon as the process starts
+    start_job_workers(app)
+
+
+def warm_up():
+    import clients  # noqa: F401  (with httpx and the OpenAI SDK)
+    import webvtt  # noqa: F401
+    import youtube_transcript_api  # noqa: F401
+    import yt_dlp  # noqa: F401
+    from transcript_utils import get_encoding
+
+    get_encoding(SUMMARY_MODEL)  # The BPE ranks are the largest thing loaded per worker
+
+
+@bp.route('/generator', methods=['GET', 'POST'])
+@profiled
+def generator():
+    if request.method == 'POST':
+        youtube_link = request.form.get('youtubeLink')
+        if not youtube_link:
+            return render_template('generator.html', error="Please provide a YouTube video URL.", youtube_link='')
+
+        # The summary is generated in the background; the page polls the job until it's finished
+        job = enqueue_summary_job(youtube_link)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(job.to_dict()), 202
+        return redirect(url_for('generator.generator', job=job.id))
+
+    error = None
+    html_summary = None
+    artifact_id = None
+    pending_job = None
+    youtube_link = request.args.get('youtubeLink', '')
+
+    job_id = request.args.get('job')
+    job = db.session.get(SummaryJob, job_id) if job_id else None
+    if job_id and not job:
+        error = "This summary request has expired. Please try again."
+    elif job:
+        youtube_link = job.youtube_link
+        if job.status == 'failed':
+            error = job.error
+        elif job.status == 'done':
+            if job.summary:
+                html_summary = job.summary.html
+                artifact_id = job.summary.artifact_id
+            else:
+                error = "This summary is no longer available. Please generate it again."
+        else:
+            pending_job = job
+
+    return render_template(
+        'generator.html',
+        summary=html_summary,
+        artifact_id=artifact_id,
+        error=error,
+        youtube_link=youtube_link,
+        video_title=job.video_title if job else None,
+        thumbnail_url=job.thumbnail_url if job else None,
+        video_length=job.video_length if job else None,
+        pending_job=pending_job
+    )
+
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = db.session.get(SummaryJob, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@bp.route('/generator/stream/<job_id>')
+def generator_stream(job_id):
+    """Server-Sent Events view of a summary job that forwards the summary as it's written.
+
+    The job is queued by a POST to /generator (its stream_url points here);
+    this only reads it, so reconnects and reopened tabs don't start new work.
+    Events: metadata, chunk events with pieces of Markdown, then done with the
+    rendered HTML (or failed with an error message). The work runs on the job
+    workers, so a client that goes away doesn't stop it and can pick it up
+    from result_url.
+    """
+    if not db.session.get(SummaryJob, job_id):
+        return jsonify({'error': 'Job not found.'}), 404
+
+    def sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    @stream_with_context
+    def events():
+        sent_metadata = False
+        sent = 0
+        started = last_event = time.monotonic()
+
+        while time.monotonic() - started < STREAM_MAX_DURATION:
+            job = db.session.get(SummaryJob, job_id)
+            if not job:
+                yield sse('failed', {'error': "This summary request has expired. Please try again."})
+                return
+
+            if job.video_title and not sent_metadata:
+                sent_metadata = True
+                yield sse('metadata', {
+                    'video_title': job.video_title,
+                    'thumbnail_url': job.thumbnail_url,
+                    'video_length': job.video_length
+                })
+            if job.status == 'done':
+                if job.summary:
+                    yield sse('done', {'html': job.summary.html, 'artifact_id': job.summary.artifact_id})
+                else:
+                    yield sse('failed', {'error': "This summary is no longer available. Please generate it again."})
+                return
+            if job.status == 'failed':
+                yield sse('failed', {'error': job.error})
+                return
+
+            text = get_job_progress(job_id)
+            if len(text) > sent:
+                yield sse('chunk', {'text': text[sent:]})
+                sent = len(text)
+                last_event = time.monotonic()
+            elif time.monotonic() - last_event >= STREAM_KEEPALIVE:
+                yield ": keepalive\n\n"  # A comment, so proxies don't drop a quiet connection
+                last_event = time.monotonic()
+
+            # Give the connection back to the pool (and let SQLite see new commits) between polls
+            db.session.close()
+            time.sleep(STREAM_POLL_INTERVAL)
+        # Ran out of time: the client falls back to polling the job
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop proxies from buffering the stream
+    })
+
+@bp.route('/fetch_metadata', methods=['POST'])
+def fetch_metadata():
+    youtube_link = request.json.get('youtubeLink')
+
+    if not youtube_link:
+        return jsonify({'error': 'No YouTube link provided.'}), 400
+
+    try:
+        info = resolve_video(youtube_link)
+
+        if not info or not info['title'] or not info['thumbnail']:
+            return jsonify({'error': 'Failed to fetch video metadata.'}), 500
+
+        return jsonify({
+            'video_id': info['id'],
+            'video_title': info['title'],
+            'thumbnail_url': info['thumbnail'],
+            'duration': info['duration'],
+            'captions': info['captions'],
+            'automatic_captions': info['automatic_captions']
+        }), 200
+
+    except Exception as e:
+        logger.error(f"An error occurred while fetching metadata: {e}")
+        return jsonify({'error': 'An unexpected error occurred.'}), 500
+
+@bp.route('/batch', methods=['POST'])
+@login_required
+def batch():
+    """Summarize a playlist or a list of video URLs, streaming newline-delimited JSON results.
+
+    Expects a JSON body with "urls" (a list of video and/or playlist URLs) or
+    "playlist" (a single URL), and an X-CSRFToken header like other POSTs.
+    """
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls') or ([data['playlist']] if data.get('playlist') else [])
+    if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+        return jsonify({'error': 'Provide "urls" as a list of video or playlist URLs, or a "playlist" URL.'}), 400
+
+    lines = (json.dumps(result) + '\n' for result in run_batch(urls))
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson', headers={
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.cli.command('summarize-batch')
+@click.argument('urls', nargs=-1)
+@click.option('--from-file', type=click.File('r'), help='Read URLs from a file, one per line.')
+@click.option('--workers', type=int, help='Videos summarized at once.  [default: BATCH_WORKERS]')
+def summarize_batch_command(urls, from_file, workers):
+    """Summarize playlists or videos and print one JSON result per line."""
+    urls = list(urls)
+    if from_file:
+        urls.extend(line.strip() for line in from_file if line.strip())
+    if not urls:
+        raise click.UsageError("Give at least one video or playlist URL.")
+
+    for result in run_batch(urls, workers=workers):
+        click.echo(json.dumps(result))
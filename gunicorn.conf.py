@@ -0,0 +1,40 @@
+"""Gunicorn settings, read automatically when gunicorn is started from this directory:
+
+    gunicorn app:app
+
+Set GUNICORN_PRELOAD=1 to import the app once in the master before forking.
+The master then also imports the heavy libraries the served components
+otherwise load on first use (yt-dlp, the OpenAI SDK, python-docx, ...) and
+the tiktoken encoding, so every worker starts warm and shares those pages
+copy-on-write instead of each loading its own copy. Without it, workers
+start faster and smaller, and "kill -HUP" reloads the code. Set
+SCRIBE_COMPONENTS to run a tier with only some of the components (see app.py).
+
+Workers are threaded (gthread, GUNICORN_THREADS per worker): /generator/stream
+and /batch hold their connection open for as long as the summaries take, which
+would tie up a whole sync worker and get it killed after the 30 second
+timeout. With gthread the timeout only applies to the worker's main loop, so
+long responses keep one thread busy and nothing else.
+"""
+import os
+
+# Gunicorn already takes the bind address from PORT and the worker count from WEB_CONCURRENCY
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        import app as scribe
+
+        scribe.warm_up(scribe.app)
+        server.log.info("Preloaded heavy modules in the master")
+
+
+def post_fork(server, worker):
+    # Background threads belong to the workers (threads don't survive a fork), and start at boot so jobs
+    # queued before a restart are picked up without waiting for new ones
+    import app as scribe
+
+    scribe.start_workers(scribe.app)
@@ -0,0 +1,79 @@
+"""Transports used by the outbound email queue to hand messages to Brevo.
+
+A transport sends a batch of messages that share a Brevo template in one API
+call and returns the provider's message ids. Set MAIL_TRANSPORT=fake to use
+FakeBrevoTransport, which records messages in memory instead of sending them
+(for tests and local development).
+"""
+import itertools
+import os
+import threading
+
+
+class BrevoTransport:
+    def send(self, template_id, messages):
+        """Send (email, params) pairs with one transactional template call."""
+        # Imported here so the Brevo SDK is only loaded by processes that actually send mail
+        import sib_api_v3_sdk
+
+        import clients
+
+        if len(messages) == 1:
+            email, params = messages[0]
+            send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+                to=[{"email": email}],
+                template_id=template_id,
+                params=params
+            )
+        else:
+            # Brevo sends one message per version, each with its own recipient and params
+            send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+                template_id=template_id,
+                message_versions=[{"to": [{"email": email}], "params": params} for email, params in messages]
+            )
+
+        response = clients.get_brevo_api().send_transac_email(
+            send_smtp_email, _request_timeout=clients.BREVO_REQUEST_TIMEOUT
+        )
+        if response.message_ids:
+            return list(response.message_ids)
+        return [response.message_id] * len(messages)
+
+
+class FakeBrevoTransport:
+    """Records messages instead of sending them. Set fail_next to make the next sends raise."""
+
+    def __init__(self):
+        self.sent = []  # (template_id, email, params) in send order
+        self.fail_next = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, template_id, messages):
+        with self._lock:
+            if self.fail_next:
+                self.fail_next -= 1
+                raise RuntimeError("Fake Brevo transport failure")
+
+            message_ids = []
+            for email, params in messages:
+                self.sent.append((template_id, email, params))
+                message_ids.append(f"<fake-{next(self._ids)}@brevo.test>")
+            return message_ids
+
+
+TRANSPORTS = {
+    'brevo': BrevoTransport,
+    'fake': FakeBrevoTransport,
+}
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = TRANSPORTS[os.getenv('MAIL_TRANSPORT', 'brevo')]()
+        return _transport
@@ -0,0 +1,68 @@
+"""Markdown to sanitized HTML for stored summaries.
+
+Summaries are rendered once, when they are stored, and the HTML is shown with
+| safe and fed to WeasyPrint, so the renderer must not let anything executable
+through. Raw HTML in the Markdown is escaped instead of passed through, and
+link and image URLs with a scheme other than http, https or mailto are dropped.
+
+Building a markdown.Markdown instance (loading extensions, registering every
+processor) costs more than converting a short summary, so each thread keeps
+one instance and resets it between documents.
+"""
+import html
+import re
+import threading
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'sane_lists']
+SAFE_URL_SCHEMES = {'http', 'https', 'mailto'}
+URL_ATTRIBUTES = {'a': 'href', 'img': 'src'}
+
+SCHEME_RE = re.compile(r'^([a-z][a-z0-9+.\-]*):')
+IGNORED_URL_CHARS_RE = re.compile(r'[\x00-\x20\x7f]+')  # Browsers skip these when reading a URL scheme
+
+
+def is_safe_url(url):
+    # Entities are decoded and whitespace/control characters dropped first, as a browser would
+    normalized = IGNORED_URL_CHARS_RE.sub('', html.unescape(url)).lower()
+    match = SCHEME_RE.match(normalized)
+    return match is None or match.group(1) in SAFE_URL_SCHEMES
+
+
+class _UrlSanitizer(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            attribute = URL_ATTRIBUTES.get(element.tag)
+            if attribute and not is_safe_url(element.get(attribute, '')):
+                del element.attrib[attribute]
+
+
+class SanitizeExtension(Extension):
+    def extendMarkdown(self, md):
+        # Escape raw HTML blocks and inline tags rather than passing them through
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        # After inline parsing and unescaping, so every URL is in its final form
+        md.treeprocessors.register(_UrlSanitizer(md), 'sanitize_urls', -10)
+
+
+_local = threading.local()
+
+
+def _get_markdown():
+    # Markdown instances aren't thread safe, so keep one per thread
+    md = getattr(_local, 'md', None)
+    if md is None:
+        md = _local.md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS + [SanitizeExtension()])
+    return md
+
+
+def render_html(markdown_text):
+    md = _get_markdown()
+    try:
+        return md.convert(markdown_text)
+    finally:
+        md.reset()
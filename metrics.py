@@ -0,0 +1,138 @@
+"""A small in-process metrics registry, rendered in the Prometheus text format.
+
+Counters and summaries are updated from anywhere in the app; gauges are
+callbacks read when the metrics are rendered. Values are per process, so with
+several gunicorn workers each one reports its own numbers, and every sample
+carries a pid label saying whose: a scrape reaches whichever worker accepts
+it, and without the label one worker's counters would look like a reset of
+another's. Sum over pid in queries (sum without (pid) (rate(...))).
+
+span() times a stage of the work into stage_duration_seconds. A thread that
+called start_timing() (each request does) also keeps its own spans, which
+become the request's Server-Timing header.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_types = {}  # name -> (type, help)
+_counters = {}  # (name, labels) -> value
+_summaries = {}  # (name, labels) -> [count, sum, max]
+_gauges = {}  # name -> callable returning a number or a {labels dict items tuple: number} mapping
+_local = threading.local()  # spans: {stage: seconds} for the current request, or None when not timing
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _declare(name, metric_type, help):
+    if name not in _types:
+        _types[name] = (metric_type, help or name.replace('_', ' '))
+
+
+def inc(name, value=1, help=None, **labels):
+    with _lock:
+        _declare(name, 'counter', help)
+        key = (name, _label_key(labels))
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, help=None, **labels):
+    """Record one observation (typically a duration in seconds) in a summary."""
+    with _lock:
+        _declare(name, 'summary', help)
+        key = (name, _label_key(labels))
+        stats = _summaries.setdefault(key, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = max(stats[2], value)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as one stage (metadata, captions, summarize, render, ...)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe('stage_duration_seconds', elapsed, help='time spent in each stage of the work', stage=stage)
+        spans = getattr(_local, 'spans', None)
+        if spans is not None:
+            spans[stage] = spans.get(stage, 0.0) + elapsed
+
+
+def start_timing():
+    # Collect this thread's spans until timings() is called
+    _local.spans = {}
+
+
+def timings():
+    """Return the {stage: seconds} recorded since start_timing() and stop collecting them."""
+    spans = getattr(_local, 'spans', None)
+    _local.spans = None
+    return spans or {}
+
+
+def register_gauge(name, func, help=None):
+    with _lock:
+        _declare(name, 'gauge', help)
+        _gauges[name] = func
+
+
+def get(name, **labels):
+    # Current value of a counter, mostly useful for logging and benchmarks
+    with _lock:
+        return _counters.get((name, _label_key(labels)), 0)
+
+
+def _format(name, labels, value):
+    # Read at render time, so a worker forked from a preloaded master reports its own pid
+    labels = (('pid', os.getpid()),) + tuple(labels)
+    rendered = ','.join(f'{key}="{str(val)}"' for key, val in labels)
+    return f"{name}{{{rendered}}} {value}"
+
+
+def render():
+    with _lock:
+        counters = dict(_counters)
+        summaries = {key: list(stats) for key, stats in _summaries.items()}
+        gauges = dict(_gauges)
+        types = dict(_types)
+
+    lines = []
+    for name in sorted(types):
+        metric_type, help = types[name]
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+        if metric_type == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(_format(name, labels, value))
+        elif metric_type == 'summary':
+            maximums = []
+            for (metric, labels), (count, total, maximum) in sorted(summaries.items()):
+                if metric == name:
+                    lines.append(_format(f"{name}_count", labels, count))
+                    lines.append(_format(f"{name}_sum", labels, round(total, 6)))
+                    maximums.append(_format(f"{name}_max", labels, round(maximum, 6)))
+            # The largest observation is its own gauge family, summaries only allow _count and _sum
+            lines.append(f"# HELP {name}_max largest {help}")
+            lines.append(f"# TYPE {name}_max gauge")
+            lines.extend(maximums)
+        else:
+            try:
+                value = gauges[name]()
+            except Exception:
+                continue
+            if isinstance(value, dict):
+                for labels, labelled_value in sorted(value.items()):
+                    lines.append(_format(name, labels, labelled_value))
+            else:
+                lines.append(_format(name, (), value))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,74 @@
+"""Re-render stored summary HTML with the sanitizing renderer
+
+Revision ID: 2c8e5a7d1f93
+Revises: 9b2f6c4e7a18
+Create Date: 2026-10-18 16:21:08.915472
+
+"""
+import html
+import re
+
+from alembic import op
+import markdown
+import sqlalchemy as sa
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8e5a7d1f93'
+down_revision = '9b2f6c4e7a18'
+branch_labels = None
+depends_on = None
+
+
+# A frozen copy of markdown_render.render_html as it was at this revision. Migrations don't import app code,
+# so later changes to the renderer can't break this one or change what it writes on a fresh database.
+SAFE_URL_SCHEMES = {'http', 'https', 'mailto'}
+URL_ATTRIBUTES = {'a': 'href', 'img': 'src'}
+SCHEME_RE = re.compile(r'^([a-z][a-z0-9+.\-]*):')
+IGNORED_URL_CHARS_RE = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def is_safe_url(url):
+    normalized = IGNORED_URL_CHARS_RE.sub('', html.unescape(url)).lower()
+    match = SCHEME_RE.match(normalized)
+    return match is None or match.group(1) in SAFE_URL_SCHEMES
+
+
+class UrlSanitizer(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            attribute = URL_ATTRIBUTES.get(element.tag)
+            if attribute and not is_safe_url(element.get(attribute, '')):
+                del element.attrib[attribute]
+
+
+class SanitizeExtension(Extension):
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        md.treeprocessors.register(UrlSanitizer(md), 'sanitize_urls', -10)
+
+
+def render_html(md, markdown_text):
+    try:
+        return md.convert(markdown_text)
+    finally:
+        md.reset()
+
+
+def upgrade():
+    # Summaries stored so far were rendered with raw HTML passed through
+    md = markdown.Markdown(extensions=['fenced_code', 'sane_lists', SanitizeExtension()])
+    connection = op.get_bind()
+    summary = sa.table('summary', sa.column('id', sa.Integer), sa.column('markdown_text', sa.Text), sa.column('html', sa.Text))
+    for summary_id, markdown_text in connection.execute(sa.select(summary.c.id, summary.c.markdown_text)).fetchall():
+        connection.execute(
+            summary.update().where(summary.c.id == summary_id).values(html=render_html(md, markdown_text))
+        )
+
+
+def downgrade():
+    # The sanitized HTML is kept; there is nothing to undo
+    pass
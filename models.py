@@ -0,0 +1,158 @@
+"""Database models, and the per-process cache of users loaded by Flask-Login."""
+import gzip
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import url_for
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached, validates
+
+from extensions import db, login_manager
+
+
+# Define User model
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(150), unique=True, nullable=False)
+    password = db.Column(db.String(150), nullable=False)
+    is_confirmed = db.Column(db.Boolean, default=False)
+    confirmation_token = db.Column(db.String(100), nullable=True)
+    usage_count = db.Column(db.Integer, default=0)
+    plan = db.Column(db.String(50), default='free')
+    last_confirmation_sent_at = db.Column(db.DateTime, nullable=True)
+    failed_attempts = db.Column(db.Integer, default=0)  # Track failed login attempts
+    lock_until = db.Column(db.DateTime, nullable=True)
+    # Trimmed, lower-cased email that every lookup goes through; email keeps the address as it was entered
+    email_normalized = db.Column(db.String(150), unique=True, index=True, nullable=True)
+
+    @validates('email')
+    def set_email_normalized(self, key, email):
+        self.email_normalized = normalize_email(email)
+        return email
+
+def normalize_email(email):
+    return email.strip().lower()
+
+# Generated summaries, keyed by video, transcript, model and prompt version
+class Summary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    artifact_id = db.Column(db.String(32), unique=True, index=True, nullable=False, default=lambda: uuid.uuid4().hex)  # Opaque id used by download links
+    cache_key = db.Column(db.String(64), unique=True, nullable=False)
+    video_id = db.Column(db.String(20), nullable=False, index=True)
+    transcript_digest = db.Column(db.String(64), nullable=False)
+    model = db.Column(db.String(50), nullable=False)
+    prompt_version = db.Column(db.Integer, nullable=False)
+    markdown_text = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text, nullable=False)  # Rendered once when the summary is stored
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    hit_count = db.Column(db.Integer, default=0)
+
+# Caption segments (text, start, duration) per video and language, stored as gzip-compressed JSON
+class Transcript(db.Model):
+    __table_args__ = (db.UniqueConstraint('video_id', 'language'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(20), nullable=False)
+    language = db.Column(db.String(20), nullable=False)
+    is_generated = db.Column(db.Boolean, default=False)
+    segments_gz = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def segments(self):
+        return json.loads(gzip.decompress(self.segments_gz))
+
+    @segments.setter
+    def segments(self, segments):
+        self.segments_gz = gzip.compress(json.dumps(segments, separators=(',', ':')).encode('utf-8'))
+
+# Queued summary requests, worked through by background threads (see summaries.start_job_workers)
+class SummaryJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    youtube_link = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done or failed
+    error = db.Column(db.Text, nullable=True)
+    video_title = db.Column(db.String(500), nullable=True)
+    thumbnail_url = db.Column(db.String(500), nullable=True)
+    duration = db.Column(db.Integer, nullable=True)
+    summary_id = db.Column(db.Integer, db.ForeignKey('summary.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Refreshed while a worker is running the job
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    summary = db.relationship('Summary')
+
+    @property
+    def video_length(self):
+        # Duration in "hours:minutes:seconds" format
+        return str(timedelta(seconds=self.duration)) if self.duration else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'video_title': self.video_title,
+            'thumbnail_url': self.thumbnail_url,
+            'video_length': self.video_length,
+            'artifact_id': self.summary.artifact_id if self.summary else None,
+            'status_url': url_for('generator.job_status', job_id=self.id),
+            'result_url': url_for('generator.generator', job=self.id),
+            'stream_url': url_for('generator.generator_stream', job_id=self.id)
+        }
+
+# Emails waiting to be sent (or already sent) by the background mail sender
+class OutboundEmail(db.Model):
+    __table_args__ = (db.Index('ix_outbound_email_status_next_attempt_at', 'status', 'next_attempt_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(150), nullable=False)
+    template_id = db.Column(db.Integer, nullable=False)
+    params = db.Column(db.Text, nullable=False)  # JSON template parameters
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    provider_message_id = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+# Users loaded for authenticated requests are kept briefly per process, so page views don't query the
+# user table every time. Writes made through the ORM in this process drop the entry straight away;
+# other workers see them once the entry expires.
+USER_CACHE_TTL = 30  # Seconds
+
+_user_cache = {}  # user id -> (expires at, detached User snapshot)
+_user_cache_lock = threading.Lock()
+
+@login_manager.user_loader
+def load_user(user_id):
+    user_id = int(user_id)
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        # Attach a copy to this request's session without a SELECT
+        return db.session.merge(cached[1], load=False)
+
+    user = db.session.get(User, user_id)
+    if user:
+        snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+        make_transient_to_detached(snapshot)
+        with _user_cache_lock:
+            _user_cache[user_id] = (time.monotonic() + USER_CACHE_TTL, snapshot)
+    return user
+
+def forget_cached_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, user):
+    forget_cached_user(user.id)
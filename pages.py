@@ -0,0 +1,68 @@
+"""Static pages, the metrics endpoint, request timing and error pages, served by every tier."""
+import os
+import time
+
+from flask import Blueprint, Response, g, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user
+
+import metrics
+
+bp = Blueprint('pages', __name__)
+
+
+@bp.route('/', methods=['GET', 'POST'])
+def landing():
+    user_plan = None
+    if current_user.is_authenticated:
+        user_plan = current_user.plan
+
+    if request.method == 'POST':
+        youtube_link = request.form.get('youtubeLink')
+        return redirect(url_for('generator.generator') + f"?youtubeLink={youtube_link}")
+
+    return render_template('landing.html', user_plan=user_plan)
+
+@bp.route('/about')
+def about():
+    return render_template('about.html')
+
+@bp.route('/pricing')
+def pricing():
+    return render_template('pricing.html')
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    # Prometheus scrape endpoint; set METRICS_TOKEN to require "Authorization: Bearer <token>"
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({'error': 'Forbidden.'}), 403
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.before_app_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    metrics.start_timing()
+
+@bp.after_app_request
+def add_server_timing(response):
+    # Stages timed while handling the request, plus the total, for the browser's network panel.
+    # Streamed responses only include what ran before their first byte.
+    spans = metrics.timings()
+    started = g.get('request_started')
+    if started is None:
+        return response
+
+    total = time.perf_counter() - started
+    metrics.observe(
+        'request_duration_seconds', total, help='time to handle a request, up to the first byte',
+        endpoint=request.endpoint or 'none'
+    )
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in spans.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+# Error handler for rate limit exceeded (429 Too Many Requests)
+@bp.app_errorhandler(429)
+def ratelimit_handler(e):
+    return render_template('429.html'), 429
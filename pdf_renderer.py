@@ -0,0 +1,151 @@
+"""PDF rendering for summary downloads, on a pool of warm WeasyPrint processes.
+
+Setting up WeasyPrint (importing it, loading fonts, parsing the stylesheet)
+costs far more than rendering a short summary, so each pool process does that
+once when it starts and reuses the result for every render. Renders run in
+separate processes so they don't hold the GIL in the request threads, and the
+pool size bounds how many run at once. Set PDF_RENDER_WORKERS=0 to render in
+the calling process instead (still warm after the first render).
+
+A render that takes longer than PDF_RENDER_TIMEOUT raises PdfRenderTimeout,
+and the pool's processes are stopped so the stuck one doesn't keep its slot.
+A pool that breaks again after being replaced raises PdfRenderError.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'fonts')
+
+PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', 2))
+PDF_RENDER_TIMEOUT = 60  # Seconds
+
+# Bump when the stylesheet changes so cached PDFs are rendered again
+STYLESHEET_VERSION = 1
+
+FONT_WEIGHTS = {
+    'Light': 300,
+    'Regular': 400,
+    'Medium': 500,
+    'SemiBold': 600,
+    'Bold': 700,
+}
+
+
+def stylesheet_source():
+    font_faces = ''.join(
+        f"""
+        @font-face {{
+            font-family: 'SUSEfont';
+            src: url('file://{os.path.join(FONTS_DIR, f'SUSE-{name}.ttf')}') format('truetype');
+            font-weight: {weight};
+        }}"""
+        for name, weight in FONT_WEIGHTS.items()
+    )
+    return font_faces + """
+        @page { size: A4; margin: 2cm; }
+        body { font-family: 'SUSEfont', Arial, sans-serif; font-size: 11pt; line-height: 1.5; }
+        h1, h2, h3 { font-weight: 700; margin-top: 1.2em; }
+        li { margin-bottom: 0.3em; }
+        code, pre { font-family: 'Courier New', monospace; }
+        pre { white-space: pre-wrap; }
+    """
+
+
+class PdfRenderError(Exception):
+    """The render pool couldn't produce the PDF."""
+
+
+class PdfRenderTimeout(PdfRenderError):
+    """A render didn't finish within PDF_RENDER_TIMEOUT."""
+
+
+_stylesheet = None
+_font_config = None
+
+
+def warm_up():
+    """Import WeasyPrint and build the shared stylesheet and font configuration."""
+    global _stylesheet, _font_config
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    _font_config = FontConfiguration()
+    _stylesheet = CSS(string=stylesheet_source(), font_config=_font_config)
+    # Render once so font loading and layout caches are populated too
+    HTML(string="<p>Warm up</p>").write_pdf(stylesheets=[_stylesheet], font_config=_font_config)
+
+
+def render(html_body):
+    """Render a summary's HTML to PDF bytes in this process."""
+    if _stylesheet is None:
+        warm_up()
+    from weasyprint import HTML
+
+    document = f"<html><body>{html_body}</body></html>"
+    return HTML(string=document).write_pdf(stylesheets=[_stylesheet], font_config=_font_config)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn rather than fork: the app process runs background threads that a fork could copy mid-lock
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=warm_up
+            )
+        return _executor
+
+
+def _reset_executor(executor, terminate=False):
+    # Only the pool the caller used is replaced, so concurrent failures don't throw away a fresh one
+    global _executor
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+    if terminate:
+        # shutdown() waits for running renders to return, which a stuck one never does. Renders still
+        # running on the other processes fail with BrokenProcessPool and are retried on the new pool.
+        # _processes is private, so a Python that drops it only loses the termination, not the recovery
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_on(executor, html_body):
+    future = executor.submit(render, html_body)
+    try:
+        return future.result(timeout=PDF_RENDER_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        _reset_executor(executor, terminate=True)
+        raise PdfRenderTimeout(f"PDF render took longer than {PDF_RENDER_TIMEOUT} seconds")
+
+
+def render_pdf(html_body):
+    """Render a summary's HTML to PDF bytes on the render pool."""
+    if PDF_RENDER_WORKERS <= 0:
+        return render(html_body)
+
+    executor = _get_executor()
+    try:
+        return _render_on(executor, html_body)
+    except BrokenProcessPool:
+        # A render process died (e.g. killed for memory); start a fresh pool and try once more
+        _reset_executor(executor)
+        executor = _get_executor()
+        try:
+            return _render_on(executor, html_body)
+        except BrokenProcessPool as e:
+            # Broken again, so likely at startup (e.g. WeasyPrint's system libraries are missing)
+            _reset_executor(executor)
+            raise PdfRenderError(f"PDF render pool failed twice: {e}") from e
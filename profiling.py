@@ -0,0 +1,183 @@
+"""Opt-in cProfile captures of single requests on a live worker.
+
+Views wrapped with @profiled are profiled when an admin sends the
+X-Profile: 1 header, or at random for a PROFILE_SAMPLE_RATE fraction of
+requests (0, the default, turns sampling off). Each capture is a pstats file
+under instance/profiles with a small JSON record next to it; the oldest ones
+are deleted past PROFILE_MAX_FILES or PROFILE_MAX_AGE. Admins (ADMIN_EMAILS,
+comma-separated) browse them, slowest first, at /admin/profiles.
+
+cProfile only sees the request's own thread, so work handed to other threads
+or processes (background jobs, the PDF render pool) shows up as waiting. One
+request per process is profiled at a time, the others run normally.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Blueprint, abort, current_app, render_template, request, send_from_directory
+from flask_login import current_user
+
+from models import normalize_email
+
+bp = Blueprint('profiling', __name__, url_prefix='/admin/profiles')
+
+DEFAULT_CONFIG = {
+    'PROFILE_SAMPLE_RATE': float(os.getenv('PROFILE_SAMPLE_RATE', 0)),  # Fraction of requests to profile unasked
+    'PROFILE_MAX_FILES': int(os.getenv('PROFILE_MAX_FILES', 200)),
+    'PROFILE_MAX_AGE': timedelta(days=int(os.getenv('PROFILE_MAX_AGE_DAYS', 7))),
+    'ADMIN_EMAILS': os.getenv('ADMIN_EMAILS', ''),
+}
+
+PROFILE_NAME_RE = re.compile(r'^[\w.-]+$')
+
+_profiler_lock = threading.Lock()  # cProfile allows one active profiler per process on recent Pythons
+
+
+def is_admin():
+    admins = {normalize_email(email) for email in current_app.config['ADMIN_EMAILS'].split(',') if email.strip()}
+    return current_user.is_authenticated and normalize_email(current_user.email) in admins
+
+
+def profile_dir():
+    return os.path.join(current_app.instance_path, 'profiles')
+
+
+def should_profile():
+    if request.headers.get('X-Profile') == '1' and is_admin():
+        return 'requested'
+    rate = current_app.config['PROFILE_SAMPLE_RATE']
+    if rate > 0 and random.random() < rate:
+        return 'sampled'
+    return None
+
+
+def profiled(view):
+    """Profile the view when should_profile() says so, saving the capture and naming it in X-Profile-Id."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        reason = should_profile()
+        if not reason or not _profiler_lock.acquire(blocking=False):
+            return view(*args, **kwargs)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+            finally:
+                profiler.disable()
+                duration = time.perf_counter() - start
+        finally:
+            _profiler_lock.release()
+
+        try:
+            name = save_profile(profiler, duration, reason, response.status_code)
+            response.headers['X-Profile-Id'] = name
+        except OSError as e:
+            current_app.logger.error(f"Could not save a request profile: {e}")
+        return response
+    return wrapper
+
+
+def save_profile(profiler, duration, reason, status_code):
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    now = datetime.utcnow()
+    name = f"{now:%Y%m%dT%H%M%S%f}-{os.getpid()}-{request.endpoint}"
+    profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+    with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+        json.dump({
+            'name': name,
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': status_code,
+            'duration': duration,
+            'reason': reason,
+            'captured_at': now.isoformat(),
+        }, f)
+
+    prune_profiles(directory)
+    return name
+
+
+def prune_profiles(directory):
+    # Names start with the capture time, so sorting them puts the oldest first
+    names = sorted(entry[:-len('.json')] for entry in os.listdir(directory) if entry.endswith('.json'))
+    expired_before = f"{datetime.utcnow() - current_app.config['PROFILE_MAX_AGE']:%Y%m%dT%H%M%S%f}"
+    overflow = len(names) - current_app.config['PROFILE_MAX_FILES']
+
+    for index, name in enumerate(names):
+        if index >= overflow and name >= expired_before:
+            break
+        for extension in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                pass  # Another worker pruned it first
+
+
+def load_profiles():
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for entry in os.listdir(directory):
+        if entry.endswith('.json'):
+            try:
+                with open(os.path.join(directory, entry)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Pruned or still being written
+    return profiles
+
+
+@bp.before_request
+def require_admin():
+    # Hidden rather than forbidden for everyone else
+    if not is_admin():
+        abort(404)
+
+
+@bp.route('/')
+def list_profiles():
+    profiles = sorted(load_profiles(), key=lambda profile: profile['duration'], reverse=True)
+    return render_template('admin_profiles.html', profiles=profiles, sample_rate=current_app.config['PROFILE_SAMPLE_RATE'])
+
+
+@bp.route('/<name>')
+def show_profile(name):
+    if not PROFILE_NAME_RE.match(name):
+        abort(404)
+    path = os.path.join(profile_dir(), f"{name}.prof")
+    if not os.path.exists(path):
+        abort(404)
+
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        sort = 'cumulative'
+
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(50)
+    return render_template('admin_profile.html', name=name, sort=sort, stats=output.getvalue())
+
+
+@bp.route('/<name>.prof')
+def download_profile(name):
+    # For snakeviz, gprof2dot or pstats on a workstation
+    if not PROFILE_NAME_RE.match(name):
+        abort(404)
+    return send_from_directory(profile_dir(), f"{name}.prof", as_attachment=True)
@@ -0,0 +1,99 @@
+"""A limits storage backend on a local SQLite database, shared by every worker process.
+
+Flask-Limiter's memory:// storage keeps counters per process, so with several
+gunicorn workers each one enforces its own copy of every limit. Importing this
+module registers the "sqlite" scheme, so
+
+    Limiter(..., storage_uri="sqlite:////path/to/limits.db")
+
+keeps fixed-window counters in one SQLite file instead. The database runs in
+WAL mode with synchronous=NORMAL, so a hit is a single upsert that doesn't
+wait for an fsync, and readers never block the writer.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+BUSY_TIMEOUT_MS = 5000
+PRUNE_INTERVAL = 60  # Seconds between sweeps of expired counters
+
+
+class SQLiteStorage(Storage):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len("sqlite:///"):]  # Like SQLAlchemy: sqlite:///relative.db or sqlite:////absolute.db
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._local = threading.local()
+        self._last_prune = 0.0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # One connection per thread, opened again after a fork since connections can't cross processes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS limits "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _prune(self, connection, now):
+        if now - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = now
+            connection.execute("DELETE FROM limits WHERE expires_at <= ?", (now,))
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        connection = self._connection()
+        self._prune(connection, now)
+        # A counter whose window has passed starts again from this hit
+        (value,) = connection.execute(
+            """
+            INSERT INTO limits (key, value, expires_at) VALUES (:key, :amount, :expires_at)
+            ON CONFLICT (key) DO UPDATE SET
+                value = CASE WHEN expires_at <= :now THEN :amount ELSE value + :amount END,
+                expires_at = CASE WHEN expires_at <= :now OR :elastic THEN :expires_at ELSE expires_at END
+            RETURNING value
+            """,
+            {'key': key, 'amount': amount, 'expires_at': now + expiry, 'now': now, 'elastic': elastic_expiry}
+        ).fetchone()
+        return value
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM limits WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return int(row[0]) if row else int(now)
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connection().execute("DELETE FROM limits").rowcount
+
+    def clear(self, key):
+        self._connection().execute("DELETE FROM limits WHERE key = ?", (key,))
@@ -0,0 +1,98 @@
+"""Single-flight locks: one caller does a piece of work while concurrent callers wait for it.
+
+Locks are flock()ed files in a shared directory, so they work across threads
+and across gunicorn worker processes on the same host without an external
+service. The first caller for a key gets the lock and becomes the leader;
+later callers wait for it. Each waiter that gets the lock in turn asks
+done() whether the leader left a result behind: if so it lets go of the lock
+and runs unlocked, finding the results in the caches, and if not (the leader
+crashed or its client went away) it keeps the lock and becomes the next
+leader, so the work is only repeated by one caller at a time.
+Every caller is counted in the single_flight_requests_total metric by role:
+leader, coalesced (found a leader's result) or timeout (gave up waiting).
+"""
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+import metrics
+
+POLL_INTERVAL = 0.05  # Seconds between lock attempts while waiting, doubled up to MAX_POLL_INTERVAL
+MAX_POLL_INTERVAL = 0.25
+
+
+def _try_lock(path):
+    """Take the lock file at path without blocking and return its descriptor, or None if it's held."""
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+
+        # The previous holder removes the file before unlocking it; a lock on a removed file doesn't count
+        try:
+            if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+def _unlock(path, fd):
+    # Removed while still locked, so the lock files don't pile up in the directory
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    os.close(fd)
+
+
+@contextmanager
+def single_flight(key, lock_dir, timeout, done):
+    """Hold the lock for key while the block runs, waiting up to timeout seconds for another holder.
+
+    Yields True when the caller holds the lock and should do the work: it got
+    the lock straight away, or got it after waiting and done() was still
+    false. Yields False, without the lock, when done() found the previous
+    leader's result or waiting timed out.
+    """
+    os.makedirs(lock_dir, exist_ok=True)
+    path = os.path.join(lock_dir, f"{key}.lock")
+
+    fd = _try_lock(path)
+    waited = fd is None
+    start = time.monotonic()
+    delay = POLL_INTERVAL
+    while fd is None and time.monotonic() - start < timeout:
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_POLL_INTERVAL)
+        fd = _try_lock(path)
+    if waited:
+        metrics.observe('single_flight_wait_seconds', time.monotonic() - start, help='time spent waiting for a leader')
+
+    if fd is None:
+        metrics.inc('single_flight_requests_total', help='requests by single-flight role', role='timeout')
+        yield False
+        return
+
+    if waited:
+        try:
+            finished = done()
+        except BaseException:
+            _unlock(path, fd)
+            raise
+        if finished:
+            # The leader's results are cached, so the other waiters don't need to take turns
+            _unlock(path, fd)
+            metrics.inc('single_flight_requests_total', help='requests by single-flight role', role='coalesced')
+            yield False
+            return
+
+    metrics.inc('single_flight_requests_total', help='requests by single-flight role', role='leader')
+    try:
+        yield True
+    finally:
+        _unlock(path, fd)
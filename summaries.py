@@ -0,0 +1,862 @@
+"""The summary pipeline: video metadata, captions, summarization with OpenAI and the summary cache.
+
+Also runs the background summary jobs and batch summaries. Used by the
+generator blueprint; everything here expects an app context.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from io import StringIO
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+import metrics
+from extensions import cache, db
+from markdown_render import render_html
+from models import Summary, SummaryJob, Transcript
+from singleflight import single_flight
+from transcript_utils import chunk_transcript, compact_transcript, count_tokens
+from youtube_urls import canonical_video_url, normalize_video_id, parse_video_id
+
+logger = logging.getLogger(__name__)
+
+
+def openai_client():
+    # The shared, pooled OpenAI client, built with the API key from the environment on first use
+    import clients
+    return clients.get_openai_client()
+
+
+# Shared yt-dlp options for metadata extraction
+YDL_OPTS = {
+    'skip_download': True,
+    'quiet': True,
+    'extract_flat': False,  # Set to False to get detailed info
+    'http_headers': {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                      'AppleWebKit/537.36 (KHTML, like Gecko) '
+                      'Chrome/116.0.0.0 Safari/537.36',  # Use the latest Chrome UA
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Charset': 'utf-8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Referer': 'https://www.youtube.com/',
+        'Connection': 'keep-alive',
+    },
+    'retries': 5,
+    'timeout': 30,
+    'nocheckcertificate': True,
+    # 'cookiesfrombrowser': 'chrome',  # Removed previously
+    'force_generic_extractor': False,  # Ensure the YouTube extractor is used
+}
+
+VIDEO_INFO_TIMEOUT = 60 * 60  # Keep resolved video info for an hour
+
+
+def resolve_video(video_url):
+    """Run yt-dlp once for a URL and share the result with every caller.
+
+    The extracted info is stored in the Flask-Caching backend keyed by the
+    canonical video id, with a second entry mapping the submitted URL to that
+    id, so /fetch_metadata, the generator and the caption fetch all reuse the
+    same extraction (across workers too, since the cache lives on disk).
+    URLs that parse_video_id() understands are looked up by id directly;
+    the URL mapping is only needed for the ones it can't decide.
+    Returns a dict with id, title, thumbnail, duration and caption tracks, or
+    None if extraction failed.
+    """
+    video_id = parse_video_id(video_url) or cache.get(f"video_url:{video_url}")
+    if video_id:
+        info = cache.get(f"video_info:{video_id}")
+        if info:
+            count_cache_lookup('video_info', 'hit')
+            return info
+    count_cache_lookup('video_info', 'miss')
+
+    import yt_dlp
+
+    try:
+        with metrics.span('metadata'), yt_dlp.YoutubeDL(YDL_OPTS) as ydl:
+            # Extract the bare watch URL when the id is known so playlist parameters don't pull in the whole list
+            info_dict = ydl.extract_info(canonical_video_url(video_id) if video_id else video_url, download=False)
+    except Exception as e:
+        logger.error(f"An error occurred while fetching video metadata: {e}")
+        return None
+
+    info = {
+        'id': info_dict.get('id'),
+        'title': info_dict.get('title', 'Unknown Title'),
+        'thumbnail': info_dict.get('thumbnail', ''),
+        'duration': info_dict.get('duration', 0),
+        'captions': sorted(info_dict.get('subtitles') or {}),  # Manually created tracks
+        'automatic_captions': sorted(info_dict.get('automatic_captions') or {}),
+    }
+
+    if info['id']:
+        cache.set(f"video_info:{info['id']}", info, timeout=VIDEO_INFO_TIMEOUT)
+        cache.set(f"video_url:{video_url}", info['id'], timeout=VIDEO_INFO_TIMEOUT)
+    return info
+
+def count_cache_lookup(name, result):
+    metrics.inc('cache_lookups_total', help='cache lookups by cache and result', cache=name, result=result)
+
+def get_video_id(video_url):
+    # Parse the video ID offline, only falling back to yt-dlp for URLs the parser can't decide
+    video_id = parse_video_id(video_url)
+    if not video_id:
+        info = resolve_video(video_url)
+        video_id = info.get('id') if info else None
+    return video_id
+
+def fetch_video_metadata(video_url):
+    info = resolve_video(video_url)
+    if not info:
+        return None, None, None
+    return info['title'], info['thumbnail'], info['duration']
+
+def download_youtube_audio(video_url, save_path='.', metadata_only=False):
+    # This might be causing issues with YouTube bot detection and is rarely used, and is only for pro users, so getting rid of it for now.
+
+    '''
+    try:
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'outtmpl': f'{save_path}/%(title)s.%(ext)s',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'mp3',
+                'preferredquality': '192',
+            }],
+            'postprocessor_args': ['-ar', '44100'],
+            'prefer_ffmpeg': True,
+            'keepvideo': False,
+            'skip_download': metadata_only,
+            'http_headers': {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                              'AppleWebKit/537.36 (KHTML, like Gecko) '
+                              'Chrome/93.0.4577.82 Safari/537.36',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Accept-Charset': 'utf-8',
+                'Accept-Encoding': 'gzip, deflate',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Referer': 'https://www.youtube.com/',
+            },
+            'retries': 5,
+            'timeout': 30,
+            'extractor_args': {
+                'youtube': {
+                    'player_client': ['web']
+                }
+            },
+            'nocheckcertificate': True,  # Optional, if SSL errors occur
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info_dict = ydl.extract_info(video_url, download=not metadata_only)
+            if not metadata_only:
+                filename = ydl.prepare_filename(info_dict)
+                audio_file_path = os.path.splitext(filename)[0] + ".mp3"
+            else:
+                audio_file_path = None
+            video_title = info_dict.get('title', 'Unknown Title')
+            thumbnail_url = info_dict.get('thumbnail', '')
+            duration = info_dict.get('duration', 0)
+
+        return audio_file_path, video_title, thumbnail_url, duration
+    except Exception as e:
+        logger.error(f"An error occurred while downloading audio: {e}")
+        return None, None, None, None
+    '''
+    pass
+
+
+TRANSCRIPT_LANGUAGES = ['en']
+
+def download_youtube_captions(video_url):
+    """Return (transcript text, is_generated) for a video, or (None, False) without usable captions."""
+    from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound
+
+    try:
+        video_id = get_video_id(video_url)
+        
+        if not video_id:
+            logger.error(f"Could not extract video ID from URL: {video_url}")
+            return None, False
+
+        segments, is_generated = get_transcript_segments(video_id)
+        return segments_to_text(segments), is_generated
+    except (TranscriptsDisabled, NoTranscriptFound) as e:
+        logger.warning(f"No captions available for video: {video_url} - {e}")
+        return None, False
+    except Exception as e:
+        logger.error(f"An error occurred while fetching captions: {e}")
+        return None, False
+
+
+def get_transcript_segments(video_id, languages=TRANSCRIPT_LANGUAGES):
+    """Return (segments, is_generated) for a video, fetching the captions from YouTube only once.
+
+    Segments are dicts with text, start and duration (seconds), as returned by
+    YouTubeTranscriptApi; is_generated is true for YouTube's automatic
+    captions. Raises TranscriptsDisabled/NoTranscriptFound when the video has
+    no usable captions.
+    """
+    stored = Transcript.query.filter(Transcript.video_id == video_id, Transcript.language.in_(languages)).first()
+    if stored:
+        count_cache_lookup('transcript', 'hit')
+        return stored.segments, bool(stored.is_generated)
+    count_cache_lookup('transcript', 'miss')
+
+    from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
+
+    with metrics.span('captions'):
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+
+        # Prefer manually created transcripts over autogenerated
+        try:
+            transcript = transcript_list.find_transcript(languages)
+        except NoTranscriptFound:
+            transcript = transcript_list.find_generated_transcript(languages)
+
+        segments = [
+            {'text': entry['text'], 'start': entry['start'], 'duration': entry['duration']}
+            for entry in transcript.fetch()
+        ]
+    store_transcript(video_id, transcript.language_code, transcript.is_generated, segments)
+    return segments, transcript.is_generated
+
+
+def store_transcript(video_id, language, is_generated, segments):
+    stored = Transcript(video_id=video_id, language=language, is_generated=is_generated)
+    stored.segments = segments
+    db.session.add(stored)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored this transcript first
+        db.session.rollback()
+
+
+def segments_to_text(segments):
+    return '\n'.join(segment['text'] for segment in segments)
+
+
+def convert_vtt_to_text(vtt_content):
+    import webvtt
+
+    try:
+        vtt_file = StringIO(vtt_content)
+        text = ''
+        for caption in webvtt.read_buffer(vtt_file):
+            text += caption.text + '\n'
+        return text
+    except Exception as e:
+        logger.error(f"An error occurred while converting VTT to text: {e}")
+        return ''
+
+def transcribe_audio_with_whisper_api(audio_file_path):
+
+    # Temporarily removing functionality to subvert YT bot detection
+    '''
+    try:
+        with open(audio_file_path, 'rb') as audio_file:
+            transcript = client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file
+            )
+        return transcript.text
+    except Exception as e:
+        logger.error(f"An error occurred during transcription: {e}")
+        return None
+    '''
+    pass
+
+
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_PROMPT_VERSION = 3  # Bump whenever the prompts or transcript preprocessing change so cached summaries aren't reused
+
+# Transcripts longer than this are summarized map-reduce style: notes are taken from each chunk in parallel,
+# then the tutorial is written from the combined notes
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 12000))
+SUMMARY_CHUNK_OVERLAP_TOKENS = 200
+
+def summary_messages(text):
+    return [
+        {"role": "system", "content": "You are a tutorial maker. You create written tutorials that are easy to follow."},
+        {
+            "role": "user",
+            "content": f"""
+            This is an audio transcript of a tutorial, DIY project, or recipe video. Please create a detailed, structured written tutorial in Markdown format based on this transcript.
+
+            **Structure**:
+            1. **Summary**: Start with a brief summary of the tutorial. Summarize the goal and the key steps involved.
+            2. **What You Will Need**: List all the materials, tools, or prerequisites the user will need. Use bullet points.
+            3. **Step-by-Step Instructions**: Break down the process into clear, ordered steps. Use headers (### Step 1: ..., ### Step 2: ...) and ordered lists where appropriate.
+                - Include sub-steps if necessary.
+                - Use bullet points for additional notes or tips.
+            4. **Additional Notes**: If applicable, include a section for tips, common issues, or additional resources.
+
+            **Markdown Syntax**:
+            - Use # for main sections (e.g., Summary, What You Will Need).
+            - Use ## for major steps or sections within the tutorial.
+            - Use ### for sub-steps.
+            - Use bullet points for lists and additional tips or notes.
+
+            **Tone and Language**:
+            - Write in a clear, concise, and friendly tone.
+            - Assume the reader has only basic knowledge of the subject, and provide explanations where necessary.
+
+            **Handling Non-Essential Content**:
+            - Exclude any non-instructive content such as jokes, personal anecdotes, or irrelevant tangents from the final tutorial.
+
+            **Error Handling**:
+            - If a part of the transcript is unclear or seems incorrect, indicate this in the tutorial with a note (e.g., [Note: This part of the audio was unclear]).
+
+            **Transcript**:
+            {text}
+            """
+        }
+    ]
+
+def chunk_notes_messages(chunk, part, total_parts):
+    return [
+        {"role": "system", "content": "You take detailed notes on tutorial videos so a written tutorial can be made from them later."},
+        {
+            "role": "user",
+            "content": f"""
+            This is part {part} of {total_parts} of an audio transcript of a tutorial, DIY project, or recipe video. Consecutive parts overlap slightly.
+            Write detailed notes on this part in Markdown bullet points, in the order things happen. Keep every material, tool, quantity, measurement, setting and step, along with any tips or warnings.
+            Leave out jokes, personal anecdotes and irrelevant tangents. If something is unclear, say so in the notes.
+
+            **Transcript (part {part} of {total_parts})**:
+            {chunk}
+            """
+        }
+    ]
+
+def prepare_summary_input(text, is_generated=False):
+    """Return the text the tutorial is written from, condensing long transcripts first.
+
+    The transcript is compacted first (see compact_transcript; the rolling
+    overlap is only removed from auto-generated captions). If it still
+    doesn't fit in one chunk it is split on segment boundaries, notes are taken
+    from every chunk concurrently and the notes are returned in order, so the
+    latency grows with the slowest chunk rather than with the length of the video.
+    """
+    start = time.perf_counter()
+    with metrics.span('compaction'):
+        tokens_before = count_tokens(text, SUMMARY_MODEL)
+        text = compact_transcript(text, rolling_captions=is_generated)
+        tokens_after = count_tokens(text, SUMMARY_MODEL)
+    logger.info(
+        f"Transcript compaction: {tokens_before} -> {tokens_after} tokens "
+        f"in {time.perf_counter() - start:.3f}s"
+    )
+    metrics.observe('transcript_tokens', tokens_before, help='transcript length in tokens', form='raw')
+    metrics.observe('transcript_tokens', tokens_after, form='compacted')
+
+    if tokens_after <= SUMMARY_CHUNK_TOKENS:
+        return text
+
+    chunks = chunk_transcript(text, SUMMARY_MODEL, SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS)
+    chunked = time.perf_counter()
+
+    def take_notes(part, chunk):
+        chunk_start = time.perf_counter()
+        with metrics.span('chunk_notes'):
+            completion = openai_client().chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=chunk_notes_messages(chunk, part, len(chunks))
+            )
+        count_token_usage('chunk_notes', completion.usage)
+        logger.info(f"Summary map: chunk {part}/{len(chunks)} took {time.perf_counter() - chunk_start:.2f}s")
+        return completion.choices[0].message.content.strip()
+
+    with ThreadPoolExecutor(max_workers=current_app.config['SUMMARY_CHUNK_WORKERS']) as executor:
+        notes = list(executor.map(take_notes, range(1, len(chunks) + 1), chunks))
+
+    logger.info(
+        f"Summary map stage: {len(chunks)} chunks, chunking {chunked - start:.2f}s, "
+        f"notes {time.perf_counter() - chunked:.2f}s"
+    )
+    return (
+        "(The transcript was too long to send at once, so these are detailed notes taken from each consecutive part of it, in order.)\n\n"
+        + '\n\n'.join(f"## Part {part}\n{part_notes}" for part, part_notes in enumerate(notes, 1))
+    )
+
+def count_token_usage(call, usage):
+    # Tokens billed by OpenAI, from the usage block of a completion (missing if the request didn't ask for it)
+    if usage:
+        metrics.inc('openai_tokens_total', usage.prompt_tokens, help='OpenAI tokens used', call=call, kind='prompt')
+        metrics.inc('openai_tokens_total', usage.completion_tokens, call=call, kind='completion')
+
+def summarize_text(text, is_generated=False, on_text=None):
+    """Return the summary Markdown for a transcript, or None if it couldn't be generated.
+
+    on_text, if given, is called with each piece of Markdown as the completion
+    streams in.
+    """
+    try:
+        if on_text:
+            parts = []
+            for piece in stream_summary_text(text, is_generated):
+                parts.append(piece)
+                on_text(piece)
+            return ''.join(parts).strip()
+
+        summary_input = prepare_summary_input(text, is_generated)
+        start = time.perf_counter()
+        with metrics.span('summarize'):
+            completion = openai_client().chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=summary_messages(summary_input)
+            )
+        count_token_usage('summary', completion.usage)
+        logger.info(f"Summary completion took {time.perf_counter() - start:.2f}s")
+
+        summary = completion.choices[0].message.content.strip()
+        return summary
+    except Exception as e:
+        logger.error(f"An error occurred during text summarization: {e}")
+        return None
+
+def stream_summary_text(text, is_generated=False):
+    """Yield the summary Markdown piece by piece as the completion is generated."""
+    summary_input = prepare_summary_input(text, is_generated)
+    with metrics.span('summarize'):
+        stream = openai_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=summary_messages(summary_input),
+            stream=True,
+            stream_options={'include_usage': True}  # The last chunk carries the token counts
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            count_token_usage('summary', chunk.usage)
+
+
+def summary_cache_key(video_id, transcript):
+    transcript_digest = hashlib.sha256(transcript.encode('utf-8')).hexdigest()
+    key = f"{video_id}:{transcript_digest}:{SUMMARY_MODEL}:{SUMMARY_PROMPT_VERSION}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest(), transcript_digest
+
+def get_cached_summary(video_id, transcript):
+    cache_key, _ = summary_cache_key(video_id, transcript)
+    summary = Summary.query.filter_by(cache_key=cache_key).first()
+    if not summary:
+        count_cache_lookup('summary', 'miss')
+        return None
+
+    now = datetime.utcnow()
+    if summary.created_at < now - current_app.config['SUMMARY_CACHE_TTL']:
+        db.session.delete(summary)
+        db.session.commit()
+        count_cache_lookup('summary', 'expired')
+        return None
+
+    count_cache_lookup('summary', 'hit')
+
+    summary.last_accessed_at = now
+    summary.hit_count = (summary.hit_count or 0) + 1
+    db.session.commit()
+    return summary
+
+def store_summary(video_id, transcript, summary_markdown):
+    cache_key, transcript_digest = summary_cache_key(video_id, transcript)
+    with metrics.span('render'):
+        html = render_html(summary_markdown)  # Sanitized, rendered once and reused by every view and export
+    summary = Summary(
+        cache_key=cache_key,
+        video_id=video_id,
+        transcript_digest=transcript_digest,
+        model=SUMMARY_MODEL,
+        prompt_version=SUMMARY_PROMPT_VERSION,
+        markdown_text=summary_markdown,
+        html=html
+    )
+    db.session.add(summary)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same summary first
+        db.session.rollback()
+        return Summary.query.filter_by(cache_key=cache_key).first()
+
+    prune_summary_cache()
+    return summary
+
+def prune_summary_cache():
+    # Drop expired entries, then the least recently used ones beyond the size limit
+    expired_before = datetime.utcnow() - current_app.config['SUMMARY_CACHE_TTL']
+    Summary.query.filter(Summary.created_at < expired_before).delete(synchronize_session=False)
+
+    overflow = Summary.query.count() - current_app.config['SUMMARY_CACHE_MAX_ENTRIES']
+    if overflow > 0:
+        oldest_ids = [row.id for row in db.session.query(Summary.id).order_by(Summary.last_accessed_at.asc()).limit(overflow)]
+        Summary.query.filter(Summary.id.in_(oldest_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+def summarize_video(video_id, transcript, is_generated=False, on_text=None):
+    """Return the Summary for a transcript, only calling OpenAI on a cache miss (see summarize_text for on_text)."""
+    summary = get_cached_summary(video_id, transcript)
+    if summary:
+        logger.info(f"Summary cache hit for video: {video_id}")
+        return summary
+
+    summary_markdown = summarize_text(transcript, is_generated, on_text)
+    if not summary_markdown:
+        return None
+    return store_summary(video_id, transcript, summary_markdown)
+
+
+class SummaryError(Exception):
+    """A failure in the summary pipeline, with a message that can be shown to the user."""
+
+
+def require_video_info(youtube_link):
+    info = resolve_video(youtube_link)
+    if not info or not info['title'] or not info['thumbnail']:
+        raise SummaryError("Failed to fetch video metadata.")
+    return info
+
+def require_transcript(youtube_link):
+    # Returns (transcript text, is_generated)
+    transcript, is_generated = download_youtube_captions(youtube_link)
+    if not transcript:
+        raise SummaryError("No captions available for this video.")
+    return transcript, is_generated
+
+SINGLE_FLIGHT_TIMEOUT = 5 * 60  # Longest a request waits for another one working on the same video
+SINGLE_FLIGHT_ERROR_TIMEOUT = 60  # How long a failure is shared with the requests that waited for it
+
+@contextmanager
+def coalesce_video(video_id):
+    """Let one request at a time (across threads and workers) run the pipeline for a video.
+
+    Requests that arrive while another is working on the same video wait for it
+    and then run the pipeline themselves, which finds its results in the video
+    info cache, the transcript store and the summary cache. If the request they
+    waited on failed, they get its error instead of repeating the same calls.
+    If it left neither a summary nor an error (its client went away mid-stream,
+    say), one of the waiters takes over and the rest keep waiting for that one.
+    """
+    waited_since = time.time()
+    error_key = f"summary_error:{video_id}"
+    lock_dir = os.path.join(current_app.instance_path, 'locks')
+
+    def recent_failure():
+        failure = cache.get(error_key)
+        return failure if failure and failure['at'] >= waited_since else None
+
+    def leader_finished():
+        return recent_failure() is not None or cached_summary_query(video_id).first() is not None
+
+    with single_flight(f"summary-{video_id}", lock_dir, SINGLE_FLIGHT_TIMEOUT, leader_finished) as leader:
+        if not leader:
+            failure = recent_failure()
+            if failure:
+                raise SummaryError(failure['error'])
+        try:
+            yield
+        except SummaryError as e:
+            cache.set(error_key, {'error': str(e), 'at': time.time()}, timeout=SINGLE_FLIGHT_ERROR_TIMEOUT)
+            raise
+
+def generate_summary(youtube_link, on_metadata=None, on_text=None):
+    """Run the whole pipeline for a link: metadata, captions, summarization and rendering.
+
+    Returns the resolved video info and the Summary record. Raises SummaryError
+    when a step fails. on_metadata, if given, is called with the video info as
+    soon as it is known, and on_text with each piece of the summary as it is
+    written (not at all when it comes from the cache).
+    """
+    with metrics.span('pipeline'):
+        return _generate_summary(youtube_link, on_metadata, on_text)
+
+def _generate_summary(youtube_link, on_metadata, on_text):
+    video_id = parse_video_id(youtube_link) or require_video_info(youtube_link)['id']
+
+    with coalesce_video(video_id):
+        info = require_video_info(youtube_link)
+        if on_metadata:
+            on_metadata(info)
+        transcript, is_generated = require_transcript(youtube_link)
+
+        summary = summarize_video(info['id'], transcript, is_generated, on_text)
+        if not summary:
+            raise SummaryError("Failed to generate summary.")
+    return info, summary
+
+
+# Background summary jobs. The queue lives in the summary_job table so it is shared by all
+# gunicorn workers and survives restarts; each process runs a pool of SUMMARY_JOB_WORKERS threads that claim
+# jobs from it.
+JOB_POLL_INTERVAL = 2  # Seconds between queue checks when idle
+JOB_HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats of a running job
+# Running jobs without a heartbeat for this long belonged to a dead worker and are retried. A live job beats
+# however long it takes (waiting on another request for the same video, slow or retried OpenAI calls).
+JOB_STALE_AFTER = timedelta(minutes=2)
+JOB_RETENTION = timedelta(days=1)  # Finished jobs are deleted after this
+JOB_PROGRESS_INTERVAL = 0.25  # Seconds between saves of a running job's partial summary
+JOB_PROGRESS_TIMEOUT = 60 * 60
+
+_job_wakeup = threading.Event()
+_job_workers = []
+_job_workers_lock = threading.Lock()
+
+def enqueue_summary_job(youtube_link):
+    SummaryJob.query.filter(
+        SummaryJob.status.in_(['done', 'failed']),
+        SummaryJob.finished_at < datetime.utcnow() - JOB_RETENTION
+    ).delete(synchronize_session=False)
+
+    job = SummaryJob(youtube_link=youtube_link)
+    db.session.add(job)
+    db.session.commit()
+
+    start_job_workers(current_app._get_current_object())
+    _job_wakeup.set()
+    return job
+
+def start_job_workers(app):
+    # Started in every process after forking (gunicorn's post_fork, see app.start_workers). Threads don't
+    # survive a fork, so ones inherited from a parent process show up as not alive and are replaced.
+    with _job_workers_lock:
+        if any(worker.is_alive() for worker in _job_workers):
+            return
+        _job_workers.clear()
+        for i in range(app.config['SUMMARY_JOB_WORKERS']):
+            worker = threading.Thread(target=_job_worker_loop, args=(app,), name=f"summary-job-{i}", daemon=True)
+            worker.start()
+            _job_workers.append(worker)
+
+def claim_next_job():
+    now = datetime.utcnow()
+    candidates = SummaryJob.query.filter(
+        db.or_(
+            SummaryJob.status == 'queued',
+            db.and_(
+                SummaryJob.status == 'running',
+                # Jobs started before heartbeats existed only have started_at
+                db.func.coalesce(SummaryJob.heartbeat_at, SummaryJob.started_at) < now - JOB_STALE_AFTER
+            )
+        )
+    ).order_by(SummaryJob.created_at).limit(current_app.config['SUMMARY_JOB_WORKERS']).all()
+
+    for job in candidates:
+        # Conditional update so only one thread (or process) wins each job
+        claimed = SummaryJob.query.filter_by(id=job.id, status=job.status, started_at=job.started_at).update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now}, synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            return job
+    return None
+
+def job_progress_key(job_id):
+    return f"job_progress:{job_id}"
+
+def get_job_progress(job_id):
+    # The summary Markdown a running job has written so far, kept in the shared cache for /generator/stream/<job_id>
+    return cache.get(job_progress_key(job_id)) or ''
+
+def _job_heartbeat_loop(app, job_id, started_at, stop):
+    # Runs beside the job, since the job's own thread can block for minutes in one call. Matching started_at
+    # means a job that was taken over by another worker (after this process stalled) isn't kept alive from here.
+    while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            with app.app_context():
+                SummaryJob.query.filter_by(id=job_id, status='running', started_at=started_at).update(
+                    {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Summary job heartbeat failed: {e}")
+
+def run_summary_job(job):
+    parts = []
+    saved_at = 0.0
+
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_job_heartbeat_loop, args=(current_app._get_current_object(), job.id, job.started_at, stop_heartbeat),
+        name=f"summary-job-heartbeat-{job.id}", daemon=True
+    )
+    heartbeat.start()
+
+    try:
+        def record_metadata(info):
+            # Saved before summarizing so the polling page can show it while the summary is generated
+            job.video_title = info['title']
+            job.thumbnail_url = info['thumbnail']
+            job.duration = info['duration']
+            db.session.commit()
+
+        def record_text(piece):
+            nonlocal saved_at
+            parts.append(piece)
+            if time.monotonic() - saved_at >= JOB_PROGRESS_INTERVAL:
+                cache.set(job_progress_key(job.id), ''.join(parts), timeout=JOB_PROGRESS_TIMEOUT)
+                saved_at = time.monotonic()
+
+        _, summary = generate_summary(job.youtube_link, on_metadata=record_metadata, on_text=record_text)
+        job.summary_id = summary.id
+        job.status = 'done'
+    except SummaryError as e:
+        job.status = 'failed'
+        job.error = str(e)
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = f"An unexpected error occurred: {e}"
+
+    stop_heartbeat.set()
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    if parts:
+        cache.delete(job_progress_key(job.id))
+
+def _job_worker_loop(app):
+    while True:
+        try:
+            with app.app_context():
+                job = claim_next_job()
+                if job:
+                    run_summary_job(job)
+                    continue
+        except Exception as e:
+            logger.error(f"Summary job worker failed: {e}")
+        _job_wakeup.wait(JOB_POLL_INTERVAL)
+        _job_wakeup.clear()
+
+
+
+# Batch summaries for playlists and lists of URLs, for POST /batch and "flask summarize-batch".
+# Playlists are expanded with a flat yt-dlp extraction (no per-video requests), then videos are
+# summarized on a bounded thread pool and results are reported as each one finishes.
+BATCH_MAX_VIDEOS = 200
+
+def extract_playlist_entries(url):
+    """Return (video_id, title) pairs for a playlist or channel tab URL without resolving each video."""
+    import yt_dlp
+
+    opts = {**YDL_OPTS, 'extract_flat': 'in_playlist', 'playlistend': BATCH_MAX_VIDEOS}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    entries = (info.get('entries') or []) if info.get('_type') in ('playlist', 'multi_video') else [info]
+    # Channel root URLs list their tabs as nested playlists; only video entries are kept
+    return [
+        (entry['id'], entry.get('title'))
+        for entry in entries
+        if entry and normalize_video_id(entry.get('id') or '')
+    ]
+
+def resolve_batch_entries(urls):
+    """Expand the submitted URLs into a list of batch entries, one per distinct video.
+
+    Each entry is a dict with video_id and title, or url and error for input
+    that couldn't be resolved.
+    """
+    entries = []
+    seen = set()
+    for url in urls:
+        video_id = parse_video_id(url)
+        if video_id:
+            videos = [(video_id, None)]
+        else:
+            try:
+                videos = extract_playlist_entries(url)
+            except Exception as e:
+                logger.error(f"An error occurred while expanding playlist {url}: {e}")
+                videos = []
+            if not videos:
+                entries.append({'url': url, 'error': "No videos found for this URL."})
+                continue
+
+        for video_id, title in videos:
+            if video_id not in seen:
+                seen.add(video_id)
+                entries.append({'video_id': video_id, 'title': title})
+    return entries[:BATCH_MAX_VIDEOS]
+
+def cached_summary_query(video_id):
+    # Unexpired summaries of a video with the current model and prompts, newest first, without fetching its captions
+    return Summary.query.filter(
+        Summary.video_id == video_id,
+        Summary.model == SUMMARY_MODEL,
+        Summary.prompt_version == SUMMARY_PROMPT_VERSION,
+        Summary.created_at >= datetime.utcnow() - current_app.config['SUMMARY_CACHE_TTL']
+    ).order_by(Summary.created_at.desc())
+
+def find_cached_summary(video_id):
+    summary = cached_summary_query(video_id).first()
+    count_cache_lookup('summary', 'hit' if summary else 'miss')
+    if summary:
+        summary.last_accessed_at = datetime.utcnow()
+        summary.hit_count = (summary.hit_count or 0) + 1
+        db.session.commit()
+    return summary
+
+def summarize_batch_entry(app, entry):
+    result = {'video_id': entry['video_id'], 'url': canonical_video_url(entry['video_id']), 'title': entry['title']}
+    with app.app_context():
+        try:
+            summary = find_cached_summary(entry['video_id'])
+            if summary:
+                result['status'] = 'cached'
+            else:
+                info, summary = generate_summary(result['url'])
+                result['title'] = info['title']
+                result['status'] = 'done'
+            result['artifact_id'] = summary.artifact_id
+            result['summary'] = summary.markdown_text
+        except SummaryError as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while summarizing {result['url']}: {e}")
+            result['status'] = 'failed'
+            result['error'] = f"An unexpected error occurred: {e}"
+    return result
+
+def run_batch(urls, workers=None):
+    """Summarize every video in urls, yielding one result dict per entry as it finishes.
+
+    Results carry the entry's index in the resolved list, so callers can put
+    them back in playlist order; a final totals dict follows the last result.
+    workers defaults to the BATCH_WORKERS setting.
+    """
+    app = current_app._get_current_object()
+    workers = workers or app.config['BATCH_WORKERS']
+    entries = resolve_batch_entries(urls)
+    yield {'type': 'entries', 'total': len(entries)}
+
+    totals = {'done': 0, 'cached': 0, 'failed': 0}
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='batch')
+    try:
+        futures = {}
+        for index, entry in enumerate(entries):
+            if 'error' in entry:
+                totals['failed'] += 1
+                yield {'type': 'item', 'index': index, 'url': entry['url'], 'status': 'failed', 'error': entry['error']}
+            else:
+                futures[executor.submit(summarize_batch_entry, app, entry)] = index
+
+        for future in as_completed(futures):
+            result = future.result()
+            totals[result['status']] += 1
+            yield {'type': 'item', 'index': futures[future], **result}
+    finally:
+        # Stop queued videos from starting if the client went away
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    yield {'type': 'complete', **totals}
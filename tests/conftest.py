@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The app is a set of flat modules at the repository root, imported the way gunicorn and the benchmarks do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app as scribe  # noqa: E402
+from extensions import db  # noqa: E402  (the path has to be set up first)
+
+
+# Background worker threads are per process and keep the app they were started with, so tests share one app
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('scribe')
+    app = scribe.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory / 'scribe.db'}",
+        'CACHE_DIR': str(directory / 'cache'),
+        'RATELIMIT_ENABLED': False,
+        'WTF_CSRF_ENABLED': False,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
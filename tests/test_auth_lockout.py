@@ -0,0 +1,57 @@
+import threading
+
+from werkzeug.security import generate_password_hash
+
+import auth
+from extensions import db
+from models import User
+
+EMAIL = 'lockout@example.com'
+PASSWORD = 'correct horse battery staple'
+THREADS = 16
+REQUESTS = 5  # Logins per thread
+
+
+def test_concurrent_wrong_passwords_reach_at_most_max_attempts_checks(app, monkeypatch):
+    with app.app_context():
+        user = User(email=EMAIL, password=generate_password_hash(PASSWORD, method='pbkdf2:sha256'), is_confirmed=True)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    # Count how many requests get as far as the (deliberately slow) password check
+    checks = []
+    check_password_hash = auth.check_password_hash
+
+    def counting_check(pwhash, password):
+        checks.append(password)
+        return check_password_hash(pwhash, password)
+    monkeypatch.setattr(auth, 'check_password_hash', counting_check)
+
+    statuses = []
+    barrier = threading.Barrier(THREADS)
+
+    def attacker():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(REQUESTS):
+            statuses.append(client.post('/login', data={'email': EMAIL, 'password': 'guess'}).status_code)
+
+    threads = [threading.Thread(target=attacker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(statuses) == THREADS * REQUESTS
+    assert all(status < 500 for status in statuses)
+    assert len(checks) == auth.MAX_ATTEMPTS
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert user.failed_attempts == auth.MAX_ATTEMPTS  # No lost or extra counts
+        assert user.lock_until is not None
+
+    # The right password is refused too while the account is locked
+    response = app.test_client().post('/login', data={'email': EMAIL, 'password': PASSWORD})
+    assert response.location != '/generator'
+    assert len(checks) == auth.MAX_ATTEMPTS
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import app as scribe
+import mail
+import summaries
+from extensions import db
+from models import OutboundEmail, SummaryJob
+from summaries import SummaryError
+
+
+def wait_for(app, check, timeout=15):  # Longer than a worker poll interval
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            if check():
+                return True
+        time.sleep(0.05)
+    return False
+
+
+def test_job_queued_before_boot_is_picked_up(app, monkeypatch):
+    def generate_summary(youtube_link, on_metadata=None, on_text=None):
+        raise SummaryError("boom")
+    monkeypatch.setattr(summaries, 'generate_summary', generate_summary)
+
+    # Left in the queue by a previous process, nothing enqueues a new job after the restart
+    with app.app_context():
+        job = SummaryJob(youtube_link='https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+    scribe.start_workers(app)
+
+    assert wait_for(app, lambda: db.session.get(SummaryJob, job_id).status == 'failed')
+    with app.app_context():
+        assert db.session.get(SummaryJob, job_id).error == "boom"
+
+
+def test_slow_job_with_a_heartbeat_is_not_claimed_again(app, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def generate_summary(youtube_link, on_metadata=None, on_text=None):
+        started.set()
+        release.wait(10)  # Stands in for a long single-flight wait or slow OpenAI calls
+        raise SummaryError("slow")
+    monkeypatch.setattr(summaries, 'generate_summary', generate_summary)
+    monkeypatch.setattr(summaries, 'JOB_HEARTBEAT_INTERVAL', 0.1)
+    monkeypatch.setattr(summaries, 'JOB_STALE_AFTER', timedelta(seconds=0.5))
+
+    with app.app_context():
+        job = SummaryJob(youtube_link='https://www.youtube.com/watch?v=9bZkp7q19f0')
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+    scribe.start_workers(app)
+
+    try:
+        assert started.wait(10)
+        time.sleep(1.5)  # Three times the stale threshold
+        with app.app_context():
+            assert summaries.claim_next_job() is None
+            job = db.session.get(SummaryJob, job_id)
+            assert job.status == 'running'
+            assert job.heartbeat_at > job.started_at + timedelta(seconds=1)
+    finally:
+        release.set()
+    assert wait_for(app, lambda: db.session.get(SummaryJob, job_id).status == 'failed')
+
+
+def test_job_without_a_recent_heartbeat_is_claimed_again(app, monkeypatch):
+    def generate_summary(youtube_link, on_metadata=None, on_text=None):
+        raise SummaryError("retried")
+    monkeypatch.setattr(summaries, 'generate_summary', generate_summary)
+
+    # Its worker died an hour ago
+    with app.app_context():
+        long_ago = datetime.utcnow() - timedelta(hours=1)
+        job = SummaryJob(youtube_link='https://www.youtube.com/watch?v=kJQP7kiw5Fk', status='running',
+                         started_at=long_ago, heartbeat_at=long_ago)
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+    scribe.start_workers(app)
+
+    assert wait_for(app, lambda: db.session.get(SummaryJob, job_id).status == 'failed')
+    with app.app_context():
+        assert db.session.get(SummaryJob, job_id).error == "retried"
+
+
+def test_email_queued_before_boot_is_sent(app, monkeypatch):
+    transport = mail.FakeBrevoTransport()
+    monkeypatch.setattr(mail, '_transport', transport)
+
+    with app.app_context():
+        email = OutboundEmail(to_email='user@example.com', template_id=1, params=json.dumps({'name': 'User'}))
+        db.session.add(email)
+        db.session.commit()
+        email_id = email.id
+
+    scribe.start_workers(app)
+
+    assert wait_for(app, lambda: db.session.get(OutboundEmail, email_id).status == 'sent')
+    assert transport.sent == [(1, 'user@example.com', {'name': 'User'})]
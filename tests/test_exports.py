@@ -0,0 +1,54 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import pdf_renderer
+from extensions import db
+from models import Summary
+
+
+class BrokenPool:
+    """A render pool whose processes die on startup, like one without WeasyPrint's system libraries."""
+
+    def submit(self, fn, *args):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_a_pool_that_breaks_twice_raises_a_render_error(monkeypatch):
+    pools = []
+    monkeypatch.setattr(pdf_renderer, 'PDF_RENDER_WORKERS', 2)
+    monkeypatch.setattr(pdf_renderer, 'ProcessPoolExecutor', lambda **kwargs: pools.append(BrokenPool()) or pools[-1])
+    monkeypatch.setattr(pdf_renderer, '_executor', None)
+
+    with pytest.raises(pdf_renderer.PdfRenderError):
+        pdf_renderer.render_pdf('<p>Summary</p>')
+    assert len(pools) == 2
+    assert pdf_renderer._executor is None  # The next download starts a fresh pool
+
+
+@pytest.mark.parametrize('error', [
+    pdf_renderer.PdfRenderTimeout("PDF render took longer than 60 seconds"),
+    pdf_renderer.PdfRenderError("PDF render pool failed twice"),
+])
+def test_pdf_render_failure_redirects_with_a_message(app, monkeypatch, error):
+    def render_pdf(html_body):
+        raise error
+    monkeypatch.setattr(pdf_renderer, 'render_pdf', render_pdf)
+
+    with app.app_context():
+        summary = Summary(cache_key=f'render-failure-{type(error).__name__}', video_id='dQw4w9WgXcQ',
+                          transcript_digest='0' * 64, model='test', prompt_version=1, markdown_text='# Summary',
+                          html=f'<h1>{type(error).__name__}</h1>')
+        db.session.add(summary)
+        db.session.commit()
+        artifact_id = summary.artifact_id
+
+    client = app.test_client()
+    response = client.post('/download/pdf', data={'artifact_id': artifact_id})
+
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        assert 'Creating the PDF failed' in session['_flashes'][0][1]
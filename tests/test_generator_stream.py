@@ -0,0 +1,42 @@
+import json
+
+from extensions import db
+from models import Summary, SummaryJob
+
+
+def stream_events(response):
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_stream_relays_a_finished_job_without_queueing_another(app):
+    with app.app_context():
+        summary = Summary(cache_key='stream-test', video_id='dQw4w9WgXcQ', transcript_digest='0' * 64, model='test',
+                          prompt_version=1, markdown_text='# Summary', html='<h1>Summary</h1>')
+        job = SummaryJob(youtube_link='https://www.youtube.com/watch?v=dQw4w9WgXcQ', status='done',
+                         video_title='Video', thumbnail_url='https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg',
+                         duration=60, summary=summary)
+        db.session.add(job)
+        db.session.commit()
+        job_id, artifact_id = job.id, summary.artifact_id
+        jobs_before = SummaryJob.query.count()
+
+    response = app.test_client().get(f'/generator/stream/{job_id}')
+
+    assert response.mimetype == 'text/event-stream'
+    assert [event for event, _ in stream_events(response)] == ['metadata', 'done']
+    assert stream_events(response)[-1][1] == {'html': '<h1>Summary</h1>', 'artifact_id': artifact_id}
+    with app.app_context():
+        assert SummaryJob.query.count() == jobs_before
+
+
+def test_stream_of_an_unknown_job_is_not_found(app):
+    assert app.test_client().get('/generator/stream/missing').status_code == 404
+
+
+def test_stream_does_not_accept_a_link(app):
+    assert app.test_client().get('/generator/stream?youtubeLink=https://youtu.be/dQw4w9WgXcQ').status_code == 404
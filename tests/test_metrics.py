@@ -0,0 +1,37 @@
+import os
+import re
+import subprocess
+import sys
+
+import metrics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Another worker process: counts three requests and prints its /metrics page
+OTHER_WORKER = """
+import metrics
+for _ in range(3):
+    metrics.inc('test_requests_total')
+print(metrics.render())
+"""
+
+
+def samples(text, name):
+    return {int(pid): float(value) for pid, value in re.findall(rf'^{name}{{pid="(\d+)"}} (\S+)$', text, re.M)}
+
+
+def test_each_process_reports_its_counts_under_its_own_pid():
+    metrics.inc('test_requests_total')
+    other = subprocess.run([sys.executable, '-c', OTHER_WORKER], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    here = samples(metrics.render(), 'test_requests_total')
+    there = samples(other.stdout, 'test_requests_total')
+
+    assert here == {os.getpid(): 1}
+    assert len(there) == 1 and os.getpid() not in there
+    assert sum(here.values()) + sum(there.values()) == 4
+
+
+def test_labels_follow_the_pid():
+    metrics.inc('test_lookups_total', cache='pdf', result='hit')
+    assert f'test_lookups_total{{pid="{os.getpid()}",cache="pdf",result="hit"}} 1' in metrics.render()
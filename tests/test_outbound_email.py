@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+import auth
+import mail
+from extensions import db
+from models import OutboundEmail
+
+
+class ShortTransport(mail.FakeBrevoTransport):
+    """Accepts every message but returns ids for the first one only."""
+
+    def send(self, template_id, messages):
+        return super().send(template_id, messages)[:1]
+
+
+def test_emails_without_a_message_id_are_retried(app, monkeypatch):
+    monkeypatch.setattr(mail, '_transport', ShortTransport())
+
+    with app.app_context():
+        # Leased the way claim_due_emails() does, so a running sender leaves them alone
+        leased_until = datetime.utcnow() + auth.MAIL_SEND_LEASE
+        emails = [
+            OutboundEmail(to_email=f"user{i}@example.com", template_id=2, params=json.dumps({}),
+                          status='sending', next_attempt_at=leased_until)
+            for i in range(3)
+        ]
+        db.session.add_all(emails)
+        db.session.commit()
+
+        auth.send_email_batch(emails)
+
+        assert [email.status for email in emails] == ['sent', 'pending', 'pending']
+        assert emails[0].provider_message_id
+        assert all(email.provider_message_id is None and email.last_error for email in emails[1:])
+        assert all(email.attempts == 1 for email in emails)
@@ -0,0 +1,22 @@
+from transcript_utils import compact_transcript
+
+
+def test_manual_captions_keep_repeated_phrasing():
+    text = "Press the button.\nPress the button again to stop."
+    assert compact_transcript(text) == text
+
+
+def test_rolling_captions_drop_repeated_words():
+    text = "so today we are going\nwe are going to build a\nto build a birdhouse"
+    assert compact_transcript(text, rolling_captions=True) == "so today we are going to build a birdhouse"
+
+
+def test_rolling_captions_keep_short_overlaps():
+    # One or two shared words are speech, not a repeated caption line
+    text = "now take the\nthe drill and the bit"
+    assert compact_transcript(text, rolling_captions=True) == "now take the the drill and the bit"
+
+
+def test_rolling_captions_drop_a_segment_repeated_whole():
+    text = "cut the board.\nboard."
+    assert compact_transcript(text, rolling_captions=True) == "cut the board."
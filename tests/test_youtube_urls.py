@@ -0,0 +1,72 @@
+import pytest
+
+from youtube_urls import canonical_video_url, normalize_video_id, parse_video_id
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+PLAYLIST_ID = 'PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI'
+
+
+@pytest.mark.parametrize('url', [
+    f'https://www.youtube.com/watch?v={VIDEO_ID}',
+    f'https://youtube.com/watch?v={VIDEO_ID}',
+    f'http://www.youtube.com/watch?v={VIDEO_ID}&t=42s',
+    f'https://www.youtube.com/watch?feature=share&v={VIDEO_ID}',
+    f'www.youtube.com/watch?v={VIDEO_ID}',
+    f'youtube.com/watch?v={VIDEO_ID}',
+    f'  https://www.youtube.com/watch?v={VIDEO_ID}  ',
+    f'https://WWW.YouTube.com/watch?v={VIDEO_ID}',
+    f'https://m.youtube.com/watch?v={VIDEO_ID}',
+    f'https://music.youtube.com/watch?v={VIDEO_ID}&si=abc',
+    f'https://youtu.be/{VIDEO_ID}',
+    f'https://youtu.be/{VIDEO_ID}?t=10',
+    f'https://youtu.be/{VIDEO_ID}?si=XyZ123',
+    f'youtu.be/{VIDEO_ID}',
+    f'https://www.youtube.com/shorts/{VIDEO_ID}',
+    f'https://youtube.com/shorts/{VIDEO_ID}?feature=share',
+    f'https://m.youtube.com/shorts/{VIDEO_ID}',
+    f'https://www.youtube.com/embed/{VIDEO_ID}',
+    f'https://www.youtube.com/embed/{VIDEO_ID}?start=30',
+    f'https://www.youtube-nocookie.com/embed/{VIDEO_ID}',
+    f'https://www.youtube.com/live/{VIDEO_ID}?feature=share',
+    f'https://www.youtube.com/v/{VIDEO_ID}',
+    f'https://www.youtube.com/e/{VIDEO_ID}',
+    f'https://www.youtube.com/watch?v={VIDEO_ID}&list={PLAYLIST_ID}&index=3',
+    f'https://www.youtube.com/watch?list={PLAYLIST_ID}&index=3&v={VIDEO_ID}',
+    f'https://www.youtube.com/attribution_link?a=abc&u=/watch%3Fv%3D{VIDEO_ID}%26feature%3Dshare',
+    VIDEO_ID,
+])
+def test_accepted_forms(url):
+    assert parse_video_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize('url', [
+    f'https://www.youtube.com/playlist?list={PLAYLIST_ID}',
+    'https://www.youtube.com/@somechannel',
+    'https://www.youtube.com/channel/UC38IQsAvIsxxjztdMZQtwHA',
+    'https://www.youtube.com/shorts/',
+    'https://youtu.be/',
+    f'https://vimeo.com/{VIDEO_ID}',
+    f'https://example.com/watch?v={VIDEO_ID}',
+    f'https://youtube.com.example.com/watch?v={VIDEO_ID}',
+    'not a url',
+    '',
+    None,
+    # Malformed ids: too short, too long, or outside the URL-safe base64 alphabet
+    'https://www.youtube.com/watch?v=tooshort',
+    f'https://www.youtube.com/watch?v={VIDEO_ID}X',
+    'https://www.youtube.com/watch?v=dQw4w9WgX!Q',
+    f'https://youtu.be/{VIDEO_ID[:-1]}?t=10',
+    f'https://www.youtube.com/shorts/{VIDEO_ID}X',
+    'https://www.youtube.com/embed/dQw4w9Wg.cQ',
+])
+def test_rejected_forms(url):
+    assert parse_video_id(url) is None
+
+
+def test_normalize_video_id():
+    assert normalize_video_id(f' {VIDEO_ID}\n') == VIDEO_ID
+    assert normalize_video_id('dQw4w9WgXc') is None
+
+
+def test_canonical_video_url_round_trips():
+    assert parse_video_id(canonical_video_url(VIDEO_ID)) == VIDEO_ID
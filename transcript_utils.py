@@ -0,0 +1,135 @@
+"""Token counting and chunking for caption transcripts.
+
+Transcripts come from download_youtube_captions() as caption segments joined
+with newlines, so every line is one segment and chunks are only ever split
+between lines. compact_transcript() keeps that shape, with one sentence (or
+run of words) per line.
+"""
+import logging
+import re
+import threading
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4  # Rough average for English, used if the tiktoken encoding can't be loaded
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model):
+    # tiktoken downloads the BPE file on first use, so load it once per model and tolerate failures
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoding for {model}, estimating token counts instead: {e}")
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text, model):
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_transcript(text, model, max_tokens, overlap_tokens=0):
+    """Split a transcript into chunks of at most max_tokens, breaking only between segments.
+
+    Each chunk after the first starts with the last overlap_tokens worth of
+    segments from the previous one, so sentences cut at a boundary appear in
+    full in at least one chunk. A single segment longer than max_tokens is
+    never split, so its chunk can exceed the limit.
+    """
+    chunks = []
+    current = []  # (line, token count) pairs
+    current_tokens = 0
+
+    for line in text.split('\n'):
+        line_tokens = count_tokens(line, model) + 1  # +1 for the newline
+        if current and current_tokens + line_tokens > max_tokens:
+            chunks.append('\n'.join(segment for segment, _ in current))
+
+            # Carry the tail of this chunk over into the next one
+            overlap = []
+            overlap_count = 0
+            for segment, tokens in reversed(current):
+                if overlap_count + tokens > overlap_tokens:
+                    break
+                overlap.insert(0, (segment, tokens))
+                overlap_count += tokens
+            current, current_tokens = overlap, overlap_count
+
+        current.append((line, line_tokens))
+        current_tokens += line_tokens
+
+    if current:
+        chunks.append('\n'.join(segment for segment, _ in current))
+    return chunks
+
+
+# Bracketed sound descriptions ([Music], [Applause], ...), parenthesised ones and music notes
+NON_SPEECH_RE = re.compile(r'\[[A-Za-z ]{1,30}\]|\((?:music|applause|laughter|laughs|inaudible|silence)\)|[♪♫]+', re.IGNORECASE)
+FILLER_RE = re.compile(r'\b(?:u+h+|u+m+|u+h+m+|e+r+m+|h+m+)\b[,.]?', re.IGNORECASE)
+SENTENCE_END_RE = re.compile(r'[.!?]["\')\]]*$')
+WORD_NORMALIZE_RE = re.compile(r'[^\w]+')
+
+OVERLAP_WINDOW = 30  # How many trailing words to compare against the start of the next segment
+MIN_OVERLAP_WORDS = 3  # Shorter overlaps are only dropped when they make up the whole segment
+MAX_LINE_WORDS = 40  # Unpunctuated auto captions are broken into lines of at most this many words
+
+
+def _normalize_word(word):
+    return WORD_NORMALIZE_RE.sub('', word.lower())
+
+
+def _overlap_length(previous, words):
+    # Longest run of words that ends previous and starts words (auto captions repeat the last line).
+    # A word or two in common is usually just speech ("the", "press the"), so it only counts when
+    # it is several words long or the whole segment is a repeat.
+    for size in range(min(len(previous), len(words)), 0, -1):
+        if previous[-size:] == words[:size]:
+            return size if size >= MIN_OVERLAP_WORDS or size == len(words) else 0
+    return 0
+
+
+def compact_transcript(text, rolling_captions=False):
+    """Shrink a caption transcript before it is sent to the model.
+
+    Removes non-speech tags and filler words and merges the remaining
+    fragments into one sentence per line. With rolling_captions (YouTube's
+    auto-generated tracks, Transcript.is_generated) it also drops the words a
+    segment repeats from the end of the previous one; manual captions are
+    kept as written, repeated phrasing included. Returns the original text if
+    nothing would be left.
+    """
+    lines = []
+    sentence = []
+    recent = []  # Normalized trailing words, for overlap detection
+
+    for segment in text.split('\n'):
+        segment = FILLER_RE.sub(' ', NON_SPEECH_RE.sub(' ', segment))
+        words = segment.split()
+        if not words:
+            continue
+
+        if rolling_captions:
+            normalized = [_normalize_word(word) for word in words]
+            overlap = _overlap_length(recent, normalized)
+            words = words[overlap:]
+            recent = (recent + normalized[overlap:])[-OVERLAP_WINDOW:]
+
+        for word in words:
+            sentence.append(word)
+            if SENTENCE_END_RE.search(word) or len(sentence) >= MAX_LINE_WORDS:
+                lines.append(' '.join(sentence))
+                sentence = []
+
+    if sentence:
+        lines.append(' '.join(sentence))
+    return '\n'.join(lines) if lines else text
@@ -0,0 +1,91 @@
+"""Offline parsing of YouTube URLs into canonical video ids.
+
+Nothing in here touches the network or imports yt-dlp, so callers that only
+need the video id (e.g. the caption fetch) can skip a full extraction. When
+parse_video_id() can't decide, it returns None and the caller should fall back
+to yt-dlp.
+"""
+import re
+from urllib.parse import urlsplit, parse_qs
+
+# YouTube video ids are always 11 characters from the URL-safe base64 alphabet
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+YOUTUBE_HOSTS = {
+    'youtube.com',
+    'm.youtube.com',
+    'music.youtube.com',
+    'gaming.youtube.com',
+    'youtube-nocookie.com',
+}
+SHORT_HOSTS = {'youtu.be'}
+
+# Path prefixes that are followed directly by the video id, e.g. /shorts/<id>
+ID_PATH_PREFIXES = {'shorts', 'embed', 'live', 'v', 'e'}
+
+
+def normalize_video_id(value):
+    """Return value as a canonical video id, or None if it isn't one."""
+    if not value:
+        return None
+    value = value.strip()
+    if VIDEO_ID_RE.match(value):
+        return value
+    return None
+
+
+def canonical_video_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def _normalize_host(host):
+    host = host.lower().split(':', 1)[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def parse_video_id(url):
+    """Extract the video id from a YouTube URL without calling yt-dlp.
+
+    Handles watch?v=, youtu.be, /shorts/, /embed/, /live/, /v/, mobile and
+    music hosts, playlist URLs that carry a v= parameter, attribution links
+    and bare ids. Returns None for anything it can't decide on.
+    """
+    if not url:
+        return None
+    url = url.strip()
+
+    video_id = normalize_video_id(url)
+    if video_id:
+        return video_id
+
+    if '://' not in url:
+        url = 'https://' + url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+
+    host = _normalize_host(parts.netloc)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    query = parse_qs(parts.query)
+
+    if host in SHORT_HOSTS:
+        return normalize_video_id(segments[0]) if segments else None
+
+    if host not in YOUTUBE_HOSTS:
+        return None
+
+    if 'v' in query:
+        return normalize_video_id(query['v'][0])
+
+    if segments and segments[0] in ID_PATH_PREFIXES and len(segments) > 1:
+        return normalize_video_id(segments[1])
+
+    # /attribution_link?u=/watch%3Fv%3D<id>
+    if segments == ['attribution_link'] and 'u' in query:
+        return parse_video_id('https://www.youtube.com' + query['u'][0])
+
+    return None